@@ -0,0 +1,10 @@
+"""
+Benchmarks of the construction, transform, TikZ generation and
+compilation stages of synthetic boards, of the startup of the
+package and of the memory taken by the objects.
+
+    python -m benchmarks run -o results.json
+    python -m benchmarks imports -o imports.json
+    python -m benchmarks memory -o memory.json
+    python -m benchmarks compare baseline.json results.json
+"""
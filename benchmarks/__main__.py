@@ -0,0 +1,248 @@
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import numpy as np
+
+from tikz.buffer import walk
+from .scenes import SCENES, make_board, transform
+from .imports import time_imports
+from .memory import measure_objects
+
+STAGES = ('construct', 'transform', 'tex', 'compile', 'startup', 'memory')
+
+
+def format_value(stage, value) -> str:
+    if stage == 'memory':
+        return f'{value:9.0f}B '
+    return f'{value*1e3:9.2f}ms'
+
+
+def run_scene(scene, n, compile=False):
+    """
+    Times every stage of a board once, returning the seconds taken
+    by each one and the size of the generated document.
+    """
+    board = make_board(scene, n)()
+    timings = {}
+
+    start = time.perf_counter()
+    board.construct()
+    timings['construct'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transform(board.objs)
+    for obj in walk(board.objs):
+        obj.materialize()
+    timings['transform'] = time.perf_counter() - start
+
+    sink = io.StringIO()
+    start = time.perf_counter()
+    board.write(sink)
+    timings['tex'] = time.perf_counter() - start
+
+    if compile:
+        with tempfile.TemporaryDirectory(prefix='tikz-') as build_dir, \
+                contextlib.redirect_stdout(io.StringIO()):
+            # The PDF is left in the temporary directory.
+            board.directory = build_dir
+            start = time.perf_counter()
+            board.compile(build_dir)
+            timings['compile'] = time.perf_counter() - start
+
+    return timings, len(sink.getvalue())
+
+
+def run(arguments):
+    compile = arguments.compile and shutil.which('pdflatex') is not None
+    if arguments.compile and not compile:
+        print('pdflatex not found, the compile stage is skipped.')
+
+    results = {}
+    for scene in arguments.scenes:
+        sizes = arguments.sizes or SCENES[scene][1]
+        for n in sizes:
+            # The best of the repeats is kept, as the least noisy.
+            best = {}
+            for _ in range(arguments.repeat):
+                timings, size = run_scene(scene, n, compile)
+                for stage, seconds in timings.items():
+                    best[stage] = min(best.get(stage, seconds), seconds)
+
+            name = f'{scene}[n={n}]'
+            results[name] = {**best, 'bytes': size}
+            print(f'{name:24} ' + '  '.join(
+                f'{stage} {best[stage]*1e3:9.2f}ms' for stage in STAGES if stage in best))
+
+    write_report(results, arguments)
+
+
+def imports(arguments):
+    """
+    Times the startup of the package and of the command line in
+    fresh interpreters.
+    """
+    results = {}
+    for name, seconds in time_imports(arguments.repeat).items():
+        results[name] = {'startup': seconds}
+        print(f'{name:24} startup {seconds*1e3:9.2f}ms')
+
+    write_report(results, arguments)
+
+
+def memory(arguments):
+    """
+    Measures the bytes taken by every kind of annotation object.
+    """
+    results = {}
+    for name, size in measure_objects(arguments.objects).items():
+        results[name] = {'memory': size}
+        print(f'{name:24} memory {size:9.0f}B per object')
+
+    write_report(results, arguments)
+
+
+def write_report(results, arguments):
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': getattr(arguments, 'repeat', 1),
+        },
+        'results': results,
+    }
+
+    with open(arguments.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {arguments.output}.')
+
+
+def compare(arguments):
+    """
+    Compares two result files, flagging the stages that got slower
+    than the threshold allows. Exits with 1 if any did.
+    """
+    with open(arguments.baseline) as f:
+        baseline = json.load(f)['results']
+    with open(arguments.results) as f:
+        results = json.load(f)['results']
+
+    regressions = 0
+    for name, timings in results.items():
+        if name not in baseline:
+            continue
+        for stage in STAGES:
+            old, new = baseline[name].get(stage), timings.get(stage)
+            if old is None or new is None:
+                continue
+
+            ratio = new / old if old > 0 else float('inf')
+            flag = ''
+            # The absolute tolerance is in seconds, bytes are compared
+            # by the ratio alone.
+            delta = arguments.min_delta if stage != 'memory' else 0
+            if ratio > 1 + arguments.threshold and new - old > delta:
+                flag = '  REGRESSION'
+                regressions += 1
+            elif ratio < 1 - arguments.threshold:
+                flag = '  improved'
+
+            print(
+                f'{name:24} {stage:10} {format_value(stage, old)} -> '
+                f'{format_value(stage, new)} '
+                f'{ratio:6.2f}x{flag}'
+            )
+
+    print(f'{regressions} regressions.')
+    if regressions:
+        sys.exit(1)
+
+
+def parse_arguments(args):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmarks the stages of rendering synthetic boards.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument(
+        '-o', '--output', default='benchmarks.json',
+        help='file the results are written to'
+    )
+    run_parser.add_argument(
+        '--scenes', nargs='+', choices=list(SCENES), default=list(SCENES),
+        help='scenes to benchmark'
+    )
+    run_parser.add_argument(
+        '--sizes', nargs='+', type=int,
+        help='sizes of the scenes, overriding the defaults of each one'
+    )
+    run_parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='number of runs of every scene, the fastest is kept'
+    )
+    run_parser.add_argument(
+        '--compile', action='store_true',
+        help='also time the compilation, when pdflatex is present'
+    )
+
+    imports_parser = commands.add_parser(
+        'imports', help='time the startup of the package')
+    imports_parser.add_argument(
+        '-o', '--output', default='benchmarks.json',
+        help='file the results are written to'
+    )
+    imports_parser.add_argument(
+        '--repeat', type=int, default=10,
+        help='number of runs of every command, the fastest is kept'
+    )
+
+    memory_parser = commands.add_parser(
+        'memory', help='measure the footprint of the objects')
+    memory_parser.add_argument(
+        '-o', '--output', default='benchmarks.json',
+        help='file the results are written to'
+    )
+    memory_parser.add_argument(
+        '--objects', type=int, default=10000,
+        help='number of objects of every kind alive at once'
+    )
+
+    compare_parser = commands.add_parser(
+        'compare', help='compare results against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('results')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='relative slowdown flagged as a regression'
+    )
+    compare_parser.add_argument(
+        '--min-delta', type=float, default=1e-3,
+        help='absolute slowdown in seconds below which nothing is flagged'
+    )
+
+    return parser.parse_args(args)
+
+
+def main():
+    arguments = parse_arguments(sys.argv[1:])
+    if arguments.command == 'run':
+        run(arguments)
+    elif arguments.command == 'imports':
+        imports(arguments)
+    elif arguments.command == 'memory':
+        memory(arguments)
+    else:
+        compare(arguments)
+
+
+if __name__ == '__main__':
+    main()
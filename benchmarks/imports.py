@@ -0,0 +1,41 @@
+import sys
+import time
+import subprocess
+
+# Commands timed in fresh interpreters, by name. The startup of a
+# bare interpreter is subtracted from each one.
+COMMANDS = {
+    'import tikz': ['-c', 'import tikz'],
+    'from tikz import Board': ['-c', 'from tikz import Board'],
+    'from tikz import *': ['-c', 'from tikz import *'],
+    'python -m tikz --help': ['-m', 'tikz', '--help'],
+}
+
+
+def time_command(args, repeat) -> float:
+    """
+    Returns the fastest of repeat runs of the interpreter with the
+    given arguments, in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            stdout=subprocess.DEVNULL,
+            check=True
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_imports(repeat=10) -> dict:
+    """
+    Returns the startup time of every command, without the startup
+    of the interpreter itself.
+    """
+    bare = time_command(['-c', 'pass'], repeat)
+    return {
+        name: max(time_command(args, repeat) - bare, 0.0)
+        for name, args in COMMANDS.items()
+    }
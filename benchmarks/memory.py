@@ -0,0 +1,59 @@
+import gc
+import tracemalloc
+from tikz import Dot, Line, Arrow, Text, MathText
+from .scenes import motif
+
+
+def labelled_line(idx):
+    line = Line([idx, 0.0, 0.0], [idx, 1.0, 0.0])
+    line.mark_length('a')
+    return line
+
+
+def copies(factory):
+    """
+    Returns a function making shifted copies of one object, built
+    on first use.
+    """
+    objs = []
+
+    def make(idx):
+        if not objs:
+            objs.append(factory())
+        return objs[0].copy().shift([idx, 0.0, 0.0])
+    return make
+
+
+# Objects whose footprint is measured, built from their index.
+OBJECTS = {
+    'Dot': lambda idx: Dot([idx, 0.0, 0.0]),
+    'Line': lambda idx: Line([idx, 0.0, 0.0], [idx, 1.0, 0.0]),
+    'Arrow': lambda idx: Arrow([idx, 0.0, 0.0], [idx, 1.0, 0.0], color='blue'),
+    'Text': lambda idx: Text('a', above=True),
+    'MathText': lambda idx: MathText('x_1'),
+    'Line.mark_length': labelled_line,
+    'motif': lambda idx: motif(),
+    'motif.copy': copies(motif),
+}
+
+
+def measure(make, n) -> float:
+    """
+    Returns the bytes allocated per object, including its points,
+    style and subobjects, when n of them are alive.
+    """
+    # Fills the caches shared by all the objects first.
+    make(0)
+    gc.collect()
+
+    tracemalloc.start()
+    objs = [make(idx) for idx in range(n)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objs
+    return size / n
+
+
+def measure_objects(n=10000) -> dict:
+    return {name: measure(make, n) for name, make in OBJECTS.items()}
@@ -0,0 +1,104 @@
+import numpy as np
+from tikz import (
+    Board, Group, Dot, Arc, Circle, Line, Square, Angle, MathText,
+    HoldedPulley)
+
+
+def dots(n):
+    rng = np.random.default_rng(0)
+    return [Dot(point) for point in rng.uniform(-5, 5, (n, 3)) * (1, 1, 0)]
+
+
+def arcs(n):
+    rng = np.random.default_rng(1)
+    return [
+        Arc(radius, start, start + span)
+        for radius, start, span in rng.uniform((0.5, 0, 0.5), (3, 6, 3), (n, 3))
+    ]
+
+
+def deep_tree(n):
+    """
+    A chain of n objects, each one the subobject of the previous.
+    """
+    root = obj = Circle(1)
+    for idx in range(1, n):
+        child = Line([0.0, 0.0, 0.0], [1.0, idx / n, 0.0])
+        obj.add_subobjs(child)
+        obj = child
+    return [root]
+
+
+def large_group(n):
+    rng = np.random.default_rng(2)
+    kobjs = [
+        Square(side).shift(offset)
+        for side, offset in zip(rng.uniform(0.1, 1, n), rng.uniform(-5, 5, (n, 3)))
+    ]
+    return [Group(*kobjs)]
+
+
+def labels(n):
+    """
+    Label heavy scene: lines with their lengths marked, angles with
+    labels and dots with labels.
+    """
+    rng = np.random.default_rng(3)
+    objs = []
+    for idx in range(n):
+        a, b, c = rng.uniform(-5, 5, (3, 3)) * (1, 1, 0)
+        line = Line(a, b)
+        line.mark_length(f'l_{{{idx}}}')
+        angle = Angle(a, b, c, label=r'\theta')
+        dot = Dot(c).add_label(f'P_{{{idx}}}')
+        objs.extend((line, angle, dot, MathText('x').next_to(line, np.array([0.0, 1.0, 0.0]))))
+    return objs
+
+
+def motif():
+    line = Line([0.0, 0.0, 0.0], [1.0, 0.0, 0.0])
+    line.mark_length('a')
+    dot = Dot([0.0, 1.0, 0.0]).add_label('P')
+    return Group(line, HoldedPulley([2.0, 1.0, 0.0], 0.5), dot)
+
+
+def tiles(n):
+    """
+    A motif copied n times on a grid.
+    """
+    base = motif()
+    return [
+        base.copy().shift([3.0 * (idx % 30), 2.0 * (idx // 30), 0.0])
+        for idx in range(n)
+    ]
+
+
+SCENES = {
+    'dots': (dots, (100, 1000)),
+    'arcs': (arcs, (100, 1000)),
+    'deep_tree': (deep_tree, (100, 500)),
+    'large_group': (large_group, (100, 1000)),
+    'labels': (labels, (50, 200)),
+    'tiles': (tiles, (100, 1000)),
+}
+
+
+def transform(objs):
+    """
+    Applies a few transforms to every object, as boards usually do.
+    """
+    for obj in objs:
+        obj.shift([0.5, -0.25, 0.0]).rotate(0.3).scale(1.2)
+
+
+def make_board(scene, n):
+    """
+    Returns a board class whose construct builds the scene. The
+    compile cache is disabled, so every compile is measured.
+    """
+    function = SCENES[scene][0]
+
+    def construct(self):
+        self.add(*function(n))
+
+    return type(f'{scene}_{n}', (Board,), {'construct': construct, 'cache': None})
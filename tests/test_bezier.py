@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from tikz.bezier import fit_cubic_bezier
+
+
+def evaluate(bezier, u):
+    u = u[:, None]
+    v = 1 - u
+    p0, p1, p2, p3 = bezier
+    return v**3 * p0 + 3*u*v**2 * p1 + 3*u**2*v * p2 + u**3 * p3
+
+
+def curve_distances(beziers, points, samples=64):
+    """
+    Distance from every point to the curve, searched on a coarse
+    sampling of every segment and refined around the nearest samples.
+    """
+    u = np.linspace(0, 1, samples)
+    curve = np.concatenate([evaluate(bezier, u) for bezier in beziers])
+
+    distances = []
+    for point in points:
+        nearest = np.argsort(np.linalg.norm(curve - point, axis=1))[:8]
+        distance = np.inf
+        for segment, idx in (divmod(x, samples) for x in nearest):
+            fine = np.linspace(u[max(idx - 1, 0)], u[min(idx + 1, samples - 1)], 1000)
+            fine = np.linalg.norm(evaluate(beziers[segment], fine) - point, axis=1)
+            distance = min(distance, fine.min())
+        distances.append(distance)
+    return np.array(distances)
+
+
+@pytest.mark.parametrize('tolerance', [1e-1, 1e-2, 1e-3])
+def test_fit_is_within_tolerance(tolerance):
+    t = np.linspace(0, 2*np.pi, 300)
+    points = np.stack((t, np.sin(3*t), np.zeros_like(t)), axis=-1)
+
+    beziers = fit_cubic_bezier(points, tolerance)
+
+    assert curve_distances(beziers, points).max() <= tolerance
+    assert len(beziers) < len(points) / 4
+
+
+def test_fit_of_a_random_walk_is_within_tolerance():
+    rng = np.random.default_rng(1)
+    points = np.cumsum(rng.normal(size=(300, 3)) * [1, 1, 0], axis=0)
+
+    beziers = fit_cubic_bezier(points, 1e-2)
+
+    assert curve_distances(beziers, points).max() <= 1e-2
+
+
+def test_fit_is_continuous_and_keeps_the_ends():
+    t = np.linspace(0, 1, 100)
+    points = np.stack((t, t**3, np.zeros_like(t)), axis=-1)
+
+    beziers = fit_cubic_bezier(points, 1e-4)
+
+    assert np.array_equal(beziers[0, 0], points[0])
+    assert np.array_equal(beziers[-1, 3], points[-1])
+    assert np.array_equal(beziers[1:, 0], beziers[:-1, 3])
+
+
+def test_closed_fit_returns_to_the_start():
+    t = np.linspace(0, 2*np.pi, 200, endpoint=False)
+    points = np.stack((np.cos(t), 2*np.sin(t), np.zeros_like(t)), axis=-1)
+
+    beziers = fit_cubic_bezier(points, 1e-3, closed=True)
+
+    assert np.array_equal(beziers[-1, 3], beziers[0, 0])
+    assert curve_distances(beziers, points).max() <= 1e-3
+
+
+def test_fit_of_a_line_is_one_segment():
+    points = np.linspace([0, 0, 0], [3, 1, 0], 50)
+    assert fit_cubic_bezier(points, 1e-6).shape == (1, 4, 3)
+
+
+def test_fit_of_a_single_point_is_empty():
+    assert fit_cubic_bezier(np.zeros((3, 3)), 1e-3).shape == (0, 4, 3)
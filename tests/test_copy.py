@@ -0,0 +1,63 @@
+import numpy as np
+
+from tikz.object import TikzObject, Group
+
+
+def make_object():
+    return TikzObject([[0, 0, 0], [1, 0, 0], [1, 1, 0]], color='red')
+
+
+def test_copy_shares_the_points_until_modified():
+    obj = make_object()
+    copied = obj.copy()
+
+    assert np.shares_memory(obj.get_points(), copied.get_points())
+
+    copied.shift([1, 0, 0])
+    assert obj.get_points().tolist() == [[0, 0, 0], [1, 0, 0], [1, 1, 0]]
+    assert copied.get_points().tolist() == [[1, 0, 0], [2, 0, 0], [2, 1, 0]]
+
+
+def test_modifying_the_original_leaves_the_copy():
+    obj = make_object()
+    copied = obj.copy()
+
+    obj.points[0] = [5, 5, 0]
+    obj.scale(2)
+
+    assert copied.get_points().tolist() == [[0, 0, 0], [1, 0, 0], [1, 1, 0]]
+
+
+def test_copy_has_its_own_style():
+    obj = make_object()
+    copied = obj.copy()
+
+    copied.set_color('blue')
+    copied.set_fill('black')
+
+    assert obj.get_kw() == {'color': 'red'}
+    assert copied.get_kw() == {'color': 'blue', 'fill': 'black'}
+
+
+def test_copy_has_its_own_subobjects():
+    obj = make_object()
+    obj.add_subobjs(make_object())
+    copied = obj.copy()
+
+    copied.add_subobjs(make_object())
+    copied.get_subobjs()[0].shift([0, 1, 0])
+
+    assert len(obj.get_subobjs()) == 1
+    assert obj.get_subobjs()[0].get_points()[0].tolist() == [0, 0, 0]
+
+
+def test_copy_of_a_group():
+    group = Group(make_object(), make_object())
+    copied = group.copy()
+
+    copied.shift([0, 0, 1])
+
+    for kobj in group.kobjs:
+        assert kobj.get_points()[:, 2].tolist() == [0, 0, 0]
+    for kobj in copied.kobjs:
+        assert kobj.get_points()[:, 2].tolist() == [1, 1, 1]
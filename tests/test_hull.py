@@ -0,0 +1,48 @@
+import numpy as np
+
+from tikz.object import TikzObject
+from tikz.utils import convex_hull
+
+
+def test_convex_hull_keeps_the_boundary():
+    points = np.array([
+        [0.0, 0.0, 0.0],
+        [2.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],  # inside
+        [2.0, 2.0, 0.0],
+        [1.0, 2.0, 0.0],  # on the top edge
+        [0.0, 2.0, 0.0],
+    ])
+    assert convex_hull(points).tolist() == [0, 1, 3, 4, 5]
+
+
+def test_convex_hull_of_points_off_a_plane():
+    points = np.array([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 1.0],
+        [0.5, 0.1, 0.0],
+    ])
+    assert convex_hull(points).tolist() == [0, 1, 2]
+
+
+def test_get_extreme():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(500, 3))
+    points[:, 2] = 0.0
+    obj = TikzObject(points)
+
+    for direction in ([1, 0, 0], [0, -1, 0], [1, 1, 0], [-3, 1, 0]):
+        direction = np.array(direction, dtype=np.float64)
+        expected = points[np.argmax(points @ direction)]
+        assert np.array_equal(obj.get_extreme(direction), expected)
+
+
+def test_get_extreme_follows_transforms():
+    obj = TikzObject([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    assert obj.get_extreme(np.array([1.0, 0.0, 0.0])).tolist() == [1, 0, 0]
+
+    obj.shift([2, 0, 0])
+    assert obj.get_extreme(np.array([1.0, 0.0, 0.0])).tolist() == [3, 0, 0]
+
+    obj.rotate(np.pi, about_point=[2, 0, 0])
+    assert np.allclose(obj.get_extreme(np.array([-1.0, 0.0, 0.0])), [1, 0, 0])
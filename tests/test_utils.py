@@ -0,0 +1,44 @@
+import numpy as np
+
+from tikz.utils import format_number, format_points
+
+
+def test_format_points_rounds_to_precision():
+    points = np.array([[1.23456, -2.98765, 0.0]])
+    assert format_points(points, 2) == ['(1.23, -2.99)']
+    assert format_points(points, 0) == ['(1, -3)']
+
+
+def test_format_points_strips_trailing_zeros():
+    points = np.array([[1.5, 2.0, 0.0], [10.0, 0.25, 0.0], [100.0, 0.0, 0.0]])
+    assert format_points(points, 4) == ['(1.5, 2)', '(10, 0.25)', '(100, 0)']
+
+
+def test_format_points_has_no_negative_zero():
+    points = np.array([[-0.00001, -0.0, 0.0]])
+    assert format_points(points, 3) == ['(0, 0)']
+
+
+def test_format_points_drops_z_only_when_zero_everywhere():
+    flat = np.array([[1.0, 2.0, 0.0], [3.0, 4.0, 0.0]])
+    assert format_points(flat) == ['(1, 2)', '(3, 4)']
+
+    solid = np.array([[1.0, 2.0, 0.0], [3.0, 4.0, 0.5]])
+    assert format_points(solid) == ['(1, 2, 0)', '(3, 4, 0.5)']
+
+
+def test_format_points_collapses_repeated_coordinates():
+    points = np.array([[1.0, 1.0, 0.0], [1.00001, 1.0, 0.0], [2.0, 1.0, 0.0]])
+    assert format_points(points, 3) == ['(1, 1)', '(2, 1)']
+    assert format_points(points, 3, collapse=False) == ['(1, 1)', '(1, 1)', '(2, 1)']
+
+
+def test_format_points_of_no_points():
+    assert format_points(np.empty((0, 3))) == []
+
+
+def test_format_number():
+    assert format_number(2.50, 4) == '2.5'
+    assert format_number(10, 4) == '10'
+    assert format_number(-0.00001, 2) == '0'
+    assert format_number(3.14159, 0) == '3'
@@ -1,9 +1,97 @@
-from .board import Board
-from .object import TikzObject, Union, Group
-from .shape import Shape
-from .lines import *
-from .arcs import *
-from .physics import *
-from .utils import *
-from .text import *
-from .constants import *
+from importlib import import_module as _import_module
+from types import ModuleType as _ModuleType
+
+# The submodules are imported on first access to one of their names,
+# so a process that only needs Board, like the command line, does
+# not pay for numpy and the shapes it never uses.
+_OBJECTS = {
+    'Board': 'board',
+    'TikzObject': 'object',
+    'Union': 'object',
+    'Group': 'object',
+    'Shape': 'shape',
+}
+
+# Modules whose public names are exported by the package. Later
+# modules take precedence, as with star imports, but never over the
+# names above, like Union, which utils imports from typing.
+_MODULES = ('lines', 'arcs', 'physics', 'utils', 'text', 'constants')
+
+# Submodules that star imports of the package exported when it
+# imported them all eagerly.
+_SUBMODULES = (
+    'arcs', 'board', 'constants', 'lines', 'object', 'physics',
+    'properties', 'settings', 'shape', 'text', 'utils'
+)
+
+
+def _public_names(module) -> list:
+    """
+    Returns the names exported by the module: its __all__ or else
+    its public names, without the modules it imports, but numpy,
+    and the helpers it imports from modules whose names are not
+    exported.
+    """
+    names = getattr(module, '__all__', None)
+    if names is not None:
+        return names
+
+    exported = {f'{__name__}.{x}' for x in _MODULES}
+    names = []
+    for name, value in vars(module).items():
+        if name.startswith('_'):
+            continue
+        if isinstance(value, _ModuleType):
+            if value.__name__ != 'numpy':
+                continue
+        elif getattr(value, '__module__', __name__).startswith(f'{__name__}.') \
+                and value.__module__ not in exported and name not in _OBJECTS:
+            continue
+        names.append(name)
+    return names
+
+
+def _load() -> None:
+    """
+    Imports every submodule and exports their public names.
+    """
+    namespace = globals()
+
+    for module in _MODULES:
+        module = _import_module(f'.{module}', __name__)
+        namespace.update({x: getattr(module, x) for x in _public_names(module)})
+
+    for name in _OBJECTS:
+        namespace[name] = getattr(_import_module(f'.{_OBJECTS[name]}', __name__), name)
+
+
+def __getattr__(name):
+    if name == '__all__':
+        names = list(_OBJECTS)
+        for module in _MODULES:
+            module = _import_module(f'.{module}', __name__)
+            names.extend(x for x in _public_names(module) if x not in names)
+        return names + [x for x in _SUBMODULES if x not in names]
+
+    if name in _OBJECTS:
+        value = getattr(_import_module(f'.{_OBJECTS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+
+    if not name.startswith('__'):
+        try:
+            return _import_module(f'.{name}', __name__)
+        except ModuleNotFoundError as exc:
+            if exc.name != f'{__name__}.{name}':
+                raise
+
+        _load()
+        if name in globals():
+            return globals()[name]
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    _load()
+    return list(globals())
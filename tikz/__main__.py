@@ -1,50 +1,381 @@
 import os
 import sys
+import time
+from functools import partial
+import argparse
 import importlib
+import importlib.util
 import subprocess
-from .settings import BASE_DIR
+from .board import Board, render_batch
+from .cache import get_counts
 
 
-def convert_to_svg(basename):
-    to_svg = subprocess.Popen([
-        'inkscape',
-        '--export-type=svg',
-        '--pdf-poppler',
-        '-l',
-        f'{basename}.pdf'
-    ])
+def convert_to_svg(basename, digest=None, cache=None):
+    from .pipeline import inkscape_command
+
+    if cache is not None and digest is not None:
+        if cache.fetch(digest, 'svg', f'{basename}.svg'):
+            print('Document unchanged, reusing the cached svg.')
+            return True
+
+    to_svg = subprocess.Popen(inkscape_command(basename))
 
     to_svg.communicate()
 
     if to_svg.returncode == 0:
+        if cache is not None and digest is not None:
+            cache.store(digest, 'svg', f'{basename}.svg')
         print('Conversion to svg successful.')
     else:
         print('Conversion to svg failed.')
 
+    return to_svg.returncode == 0
+
+
+def import_module(filepath):
+    if filepath.endswith('.py'):
+        filepath = filepath[:-3]
+    module_name = filepath.replace('/', '.')
+
+    # Files outside the working directory are named from the entry
+    # of the import path that holds them.
+    path = os.path.abspath(filepath)
+    for entry in sys.path:
+        entry = os.path.abspath(entry or os.curdir)
+        if path.startswith(entry + os.sep):
+            module_name = os.path.relpath(path, entry).replace(os.sep, '.')
+            break
+
+    return importlib.import_module(module_name)
+
+
+def find_module(target, importable=False):
+    """
+    Returns the path of the module file the target names, as a path
+    with or without the .py suffix or, with importable, as a module
+    name. Returns None when the target names no module.
+    """
+    for filepath in (target, target + '.py', target.replace('.', '/') + '.py'):
+        if os.path.isfile(filepath):
+            return filepath
+
+    if importable:
+        try:
+            spec = importlib.util.find_spec(target)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is not None and spec.origin is not None and os.path.isfile(spec.origin):
+            return os.path.relpath(spec.origin)
+
+    return None
+
 
 def import_class(filepath, class_name):
-    module_name = filepath.replace('.py', '').replace('/', '.')
-    module = importlib.import_module(module_name)
+    module = import_module(filepath)
     class_ = getattr(module, class_name)
     return class_
 
 
+def find_boards(filepath):
+    """
+    Returns the names of the Board subclasses defined in the file.
+    """
+    from .watch import get_boards
+    return list(get_boards(import_module(filepath)))
+
+
+def get_text_strategy(name):
+    from .svg import PlainText, LatexText
+    return {'plain': PlainText, 'latex': LatexText}[name]()
+
+
+def render_instance(instance, svg=False, backend='latex', svg_text='plain', previous=None, profile=False):
+    """
+    Renders a board instance with the given backend, returning
+    whether it succeeded. With profile, the render report of the
+    board is printed.
+    """
+    if backend == 'svg':
+        success = instance.render_svg(get_text_strategy(svg_text))
+    elif backend == 'png':
+        success = instance.render_png()
+    else:
+        success = instance.render(previous=previous)
+
+        if success and svg:
+            basename = os.path.splitext(instance.get_output_path())[0]
+            with instance.profile.stage('svg conversion'):
+                success = convert_to_svg(basename, instance.digest, instance.cache)
+
+    if profile:
+        print_profiles([instance])
+
+    return success
+
+
+def render_board(filepath, class_name, **options):
+    """
+    Renders a single board, returning its name, whether it
+    succeeded, the elapsed time, the error message, if any, and the
+    hits and misses of the compile cache.
+    """
+    start = time.perf_counter()
+    hits, misses = get_counts(Board.cache)
+
+    try:
+        instance = import_class(filepath, class_name)()
+        success = render_instance(instance, **options)
+        error = None if success else 'compilation failed'
+    except Exception as exc:
+        success = False
+        error = f'{type(exc).__name__}: {exc}'
+
+    new_hits, new_misses = get_counts(Board.cache)
+    return (
+        class_name, success, time.perf_counter() - start, error,
+        new_hits - hits, new_misses - misses
+    )
+
+
+def parse_arguments(args):
+    parser = argparse.ArgumentParser(
+        prog='python -m tikz',
+        description='Renders the Board subclasses of the given modules.'
+    )
+    parser.add_argument(
+        'targets', nargs='+',
+        help='modules to render, optionally followed by the names of '
+             'the boards to render from them'
+    )
+    parser.add_argument(
+        '-svg', '--svg', action='store_true',
+        help='also convert the PDFs to svg'
+    )
+    parser.add_argument(
+        '--backend', choices=('latex', 'svg', 'png'), default='latex',
+        help='compile with LaTeX, draw the svg directly from the points '
+             'or rasterize a png preview'
+    )
+    parser.add_argument(
+        '--svg-text', choices=('plain', 'latex'), default='plain',
+        help='how the svg backend draws text nodes'
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='print the timings, object statistics and pdflatex log '
+             'statistics of every board'
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help='keep running and re-render the boards that change when '
+             'the modules are saved'
+    )
+    parser.add_argument(
+        '--async', dest='pipelined', action='store_true',
+        help='render in one process, overlapping the construction, '
+             'compilation and conversion of the boards'
+    )
+    parser.add_argument(
+        '--batch', action='store_true',
+        help='compile all boards sharing a header in a single LaTeX run'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count(),
+        help='number of boards compiled in parallel, also the number of '
+             'processes per stage with --async'
+    )
+    return parser.parse_args(args)
+
+
+def select_boards(targets):
+    """
+    Returns the names of the boards selected from every module.
+    Names given after a module select boards from it, an empty list
+    selects all of them. The first target may also name a module
+    that is only importable.
+    """
+    selected = {}
+    filepath = None
+
+    for target in targets:
+        module = find_module(target, importable=filepath is None)
+        if module is not None:
+            filepath = module
+            selected[filepath] = []
+        elif filepath is None:
+            raise ValueError(f'No module given before the board {target}.')
+        else:
+            selected[filepath].append(target)
+
+    return selected
+
+
+def collect_jobs(targets):
+    """
+    Pairs every selected board name with its module.
+    """
+    return [
+        (filepath, class_name)
+        for filepath, class_names in select_boards(targets).items()
+        for class_name in class_names or find_boards(filepath)
+    ]
+
+
+def print_profiles(instances):
+    for instance in instances:
+        print(f'Profile of {type(instance).__name__}:')
+        print(instance.profile.format())
+
+
+def render_boards_in_batch(jobs, svg=False, profile=False):
+    """
+    Renders all boards in one process with render_batch, returning
+    the same results as render_board. The boards share a compilation,
+    so the cache counts of the whole run go to the first one.
+    """
+    start = time.perf_counter()
+    hits, misses = get_counts(Board.cache)
+
+    try:
+        instances = [import_class(*job)() for job in jobs]
+        successes = render_batch(instances)
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'
+        elapsed = time.perf_counter() - start
+        return [(x[1], False, elapsed, error, 0, 0) for x in jobs]
+
+    results = []
+    for (_, class_name), instance, success in zip(jobs, instances, successes):
+        if success and svg:
+            basename = os.path.splitext(instance.get_output_path())[0]
+            with instance.profile.stage('svg conversion'):
+                success = convert_to_svg(basename, instance.digest, instance.cache)
+        error = None if success else 'compilation failed'
+        results.append((class_name, success, time.perf_counter() - start, error, 0, 0))
+
+    if profile:
+        print_profiles(instances)
+
+    return with_counts(results, hits, misses)
+
+
+def with_counts(results, hits, misses):
+    """
+    Adds the cache counts since hits and misses to the first result.
+    """
+    if not results:
+        return results
+
+    new_hits, new_misses = get_counts(Board.cache)
+    name, success, seconds, error, _, _ = results[0]
+    first = (name, success, seconds, error, new_hits - hits, new_misses - misses)
+    return [first, *results[1:]]
+
+
+def render_boards_in_pipeline(jobs, svg=False, workers=None, profile=False):
+    """
+    Renders all boards in one process with render_pipeline, running
+    at most workers pdflatex and Inkscape processes at once.
+    Returns the same results as render_board, with the cache counts
+    of the whole run in the first one.
+    """
+    import asyncio
+    from .pipeline import Stages, render_pipeline
+
+    hits, misses = get_counts(Board.cache)
+
+    try:
+        instances = [import_class(*job)() for job in jobs]
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'
+        return [(x[1], False, 0.0, error, 0, 0) for x in jobs]
+
+    async def run():
+        stages = Stages(latex=workers, convert=workers)
+        return await render_pipeline(instances, stages, svg=svg)
+
+    results = asyncio.run(run())
+
+    if profile:
+        print_profiles(instances)
+
+    results = [(x[1], *result, 0, 0) for x, result in zip(jobs, results)]
+    return with_counts(results, hits, misses)
+
+
+def print_summary(results, elapsed):
+    failures = [x for x in results if not x[1]]
+
+    print()
+    for class_name, success, seconds, error, _, _ in results:
+        status = 'ok' if success else f'FAILED ({error})'
+        print(f'{class_name:30} {seconds:8.2f}s  {status}')
+
+    print(
+        f'{len(results) - len(failures)} succeeded, {len(failures)} failed '
+        f'in {elapsed:.2f}s.'
+    )
+
+    # The boards rendered in worker processes count their own hits.
+    hits = sum(x[4] for x in results)
+    misses = sum(x[5] for x in results)
+    if hits or misses:
+        print(f'Compile cache: {hits} hits, {misses} misses.')
+
+
+def watch(arguments, options):
+    from .watch import Watcher
+
+    selected = select_boards(arguments.targets)
+    modules = {x: import_module(x) for x in selected}
+    watcher = Watcher(
+        modules, selected, partial(render_instance, **options), print_summary)
+    watcher.run()
+
+
 def run_command_line():
-    args = sys.argv
+    arguments = parse_arguments(sys.argv[1:])
+    options = {
+        'svg': arguments.svg,
+        'backend': arguments.backend,
+        'svg_text': arguments.svg_text,
+        'profile': arguments.profile,
+    }
 
-    if len(args) == 3:
-        filepath, class_name = sys.argv[1:]
-    elif len(args) == 4:
-        filepath, class_name, last_arg = sys.argv[1:]
+    if arguments.watch:
+        return watch(arguments, options)
+
+    jobs = collect_jobs(arguments.targets)
+
+    start = time.perf_counter()
+    batch = arguments.batch and arguments.backend == 'latex'
+    pipelined = arguments.pipelined and arguments.backend == 'latex'
+    in_process = batch or pipelined or len(jobs) == 1 or arguments.jobs <= 1
+
+    if batch:
+        results = render_boards_in_batch(
+            jobs, svg=arguments.svg, profile=arguments.profile)
+    elif pipelined:
+        results = render_boards_in_pipeline(
+            jobs, svg=arguments.svg, workers=arguments.jobs,
+            profile=arguments.profile)
+    elif in_process:
+        results = [render_board(*job, **options) for job in jobs]
     else:
-        raise NotImplemented
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(arguments.jobs, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(render_board, *job, **options)
+                for job in jobs
+            ]
+            results = [future.result() for future in futures]
 
-    class_ = import_class(filepath, class_name)
-    instance = class_()
-    instance.render()
+    print_summary(results, time.perf_counter() - start)
 
-    if len(args) == 4 and last_arg == '-svg':
-        convert_to_svg(class_name)
+    if not all(x[1] for x in results):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -1,50 +1,151 @@
 import numpy as np
 from .constants import ORIGIN
-from .shape import Shape
+from .shape import Shape, Parametric, template_cache, uniform_parameters
 from .lines import Lines
 from .text import MathText
-from .utils import versor, get_angle
+from .utils import versor, get_angle, rotate, format_points, format_number
 
 
-class Arc(Shape):
-    def __init__(self, radius=2, start_angle=0, end_angle=np.pi/3, **kw):
+@template_cache()
+def unit_circle_samples(start, end, samples) -> np.array:
+    """
+    Returns the uniform samples of the unit circle between the
+    angles start and end, shared by every arc with that sampling.
+    """
+    return versor(uniform_parameters(start, end, samples))
+
+
+class EllipticalArc(Shape):
+    __slots__ = ('center', 'major_axis', 'minor_axis', 'tilt', 'conformal')
+
+    def __init__(self, major_axis=2, minor_axis=1, start_angle=0, end_angle=np.pi/3, **kw):
         self.center = ORIGIN.copy()
-        self.radius = radius
+        self.major_axis = major_axis
+        self.minor_axis = minor_axis
 
-        if start_angle > end_angle:
-            start_angle -= 2*np.pi
-        
+        # Rotation about the z axis accumulated by the transforms, used
+        # to render the native TikZ primitive while the transforms
+        # applied so far are conformal.
+        self.tilt = 0.0
+        self.conformal = True
+
+        v = np.array([major_axis, minor_axis, 0.0])
+
+        def parametric(t):
+            return v * versor(t)
         super().__init__(
-            lambda t: radius * versor(t),
+            Parametric(parametric, vectorized=True),
             start_angle,
             end_angle,
             **kw
         )
 
-    def shift(self, array):
-        self.center += array
-        super().shift(array)
-        return self
+        if not self.adaptive:
+            # The points start as the shared samples of the unit
+            # circle, with the axes as the pending transform.
+            self._matrix = np.diag([major_axis, minor_axis, 1.0, 1.0])
+
+    def sample_uniform(self):
+        """
+        Returns the samples of the unit circle, the axes are applied
+        by __init__.
+        """
+        return unit_circle_samples(self.start, self.end, self.samples)
+
+    def apply_matrix(self, matrix):
+        linear = matrix[:3, :3]
+        self.center = linear @ self.center + matrix[:3, 3]
+
+        # The native primitive survives maps that keep the xy plane
+        # and act on it as a rotation composed with a uniform scale.
+        (a, b), (c, d) = linear[:2, :2]
+        det = a*d - b*c
+        conformal = (
+            self.conformal
+            and det > 0
+            and abs(linear[2, 0]) + abs(linear[2, 1]) < 1e-9
+            and abs(a - d) + abs(b + c) < 1e-9 * (abs(a) + abs(b))
+        )
 
-    def scale(self, num, about_point=None):
-        if about_point is None:
-            about_point = self.get_center()
+        if conformal:
+            self.tilt += np.arctan2(c, a)
+            self.major_axis *= np.sqrt(det)
+            self.minor_axis *= np.sqrt(det)
+        else:
+            self.conformal = False
 
-        super().scale(num, about_point=about_point)
+        return super().apply_matrix(matrix)
 
-        self.radius *= num
+    def get_point(self, angle):
+        v = np.array([self.major_axis, self.minor_axis, 0.0])
+        return self.center + rotate(v * versor(angle), self.tilt)
 
-        self.shift(-about_point)
-        self.center *= num
-        self.shift(about_point)
+    def is_circular(self):
+        return np.isclose(self.major_axis, self.minor_axis)
 
-        return self
-    
-    def get_point(self, angle):
-        return self.center + self.radius*versor(angle)
+    def get_options(self, precision: int) -> dict:
+        if not self.conformal or self.is_circular() or np.isclose(self.tilt, 0):
+            return self.get_kw()
+
+        x, y, _ = self.center
+        (center,) = format_points(np.array([[x, y, 0.0]]), precision)
+        tilt = format_number(np.degrees(self.tilt), precision)
+        return {**self.get_kw(), 'rotate around': f'{{{tilt}:{center}}}'}
+
+    def get_path(self, precision: int) -> str:
+        if not self.conformal:
+            return super().get_path(precision)
+
+        major_axis = format_number(self.major_axis, precision)
+        minor_axis = format_number(self.minor_axis, precision)
+
+        if self.is_circular():
+            tilt = self.tilt
+            radii = f'radius={major_axis}'
+        else:
+            # The tilt is handled by the rotate around option.
+            tilt = 0.0
+            radii = f'x radius={major_axis}, y radius={minor_axis}'
+
+        if self.closed:
+            (center,) = format_points(np.array([self.center]), precision)
+            operation = 'circle' if self.is_circular() else 'ellipse'
+            return f'{center} {operation}[{radii}]'
+
+        v = np.array([self.major_axis, self.minor_axis, 0.0])
+        start = self.center + rotate(v * versor(self.start), tilt)
+        (start,) = format_points(np.array([start]), precision)
+        start_angle = format_number(np.degrees(self.start + tilt), precision)
+        end_angle = format_number(np.degrees(self.end + tilt), precision)
+        return (
+            f'{start} arc[start angle={start_angle}, '
+            f'end angle={end_angle}, {radii}]'
+        )
+
+
+class Arc(EllipticalArc):
+    __slots__ = ()
+
+    def __init__(self, radius=2, start_angle=0, end_angle=np.pi/3, **kw):
+        if start_angle > end_angle:
+            start_angle -= 2*np.pi
+        
+        super().__init__(radius, radius, start_angle, end_angle, **kw)
+
+    @property
+    def radius(self):
+        return self.major_axis
+
+    @radius.setter
+    def radius(self, value):
+        self.major_axis = value
+        self.minor_axis = value
+        self.touch()
 
 
 class Circle(Arc):
+    __slots__ = ()
+
     closed = True
 
     def __init__(self, radius=2, **kw) -> None:
@@ -52,6 +153,8 @@ class Circle(Arc):
 
 
 class Dot(Circle):
+    __slots__ = ()
+
     def __init__(self, array, **kw):
         super().__init__(0.03, **kw)
         self.shift(array).set_fill('black')
@@ -65,15 +168,9 @@ class Dot(Circle):
         return self
 
 
-class EllipticalArc(Shape):
-    def __init__(self, major_axis=2, minor_axis=1, start_angle=0, end_angle=np.pi/3, **kw):
-        def parametric(t):
-            v = np.array([major_axis, minor_axis, 0.0])
-            return v * versor(t)
-        super().__init__(parametric, start_angle, end_angle, **kw)
-
-
 class Ellipse(EllipticalArc):
+    __slots__ = ()
+
     closed = True
 
     def __init__(self, major_axis=2, minor_axis=1, **kw):
@@ -81,18 +178,25 @@ class Ellipse(EllipticalArc):
 
 
 class Parabola(Shape):
+    __slots__ = ()
+
     def __init__(self, parameter=1, start=0, end=5, axis=0, **kw):
         if axis == 0:
             def parametric(t):
-                return np.array([t**2/(2*parameter), t, 0.0])
+                t = np.asarray(t, dtype=np.float64)
+                return np.stack(
+                    (t**2/(2*parameter), t, np.zeros_like(t)), axis=-1)
         elif axis == 1:
             def parametric(t):
-                return np.array([t, t**2/(2*parameter), 0.0])
+                t = np.asarray(t, dtype=np.float64)
+                return np.stack(
+                    (t, t**2/(2*parameter), np.zeros_like(t)), axis=-1)
         else:
             raise NotImplementedError(
                 'The axis kwargs was only implemented to the values 0 and 1')
 
-        super().__init__(parametric, start, end, **kw)
+        super().__init__(
+            Parametric(parametric, vectorized=True), start, end, **kw)
 
     @classmethod
     def from_three_points(cls, point_1, point_2, point_3, axis=0, **kw):
@@ -163,6 +267,8 @@ class Parabola(Shape):
 
 
 class Angle(Arc):
+    __slots__ = ()
+
     def __init__(self, A, B, C, radius=0.45, label=None, label_pos=0.65, **kw) -> None:
         A = np.array(A, dtype=np.float64)
         B = np.array(B, dtype=np.float64)
@@ -192,6 +298,8 @@ class Angle(Arc):
 
 
 class RightAngle(Lines):
+    __slots__ = ()
+
     def __init__(self, A, B, C, size=0.2, dot=True, **kw) -> None:
         A = np.array(A, dtype=np.float64)
         B = np.array(B, dtype=np.float64)
@@ -0,0 +1,178 @@
+import numpy as np
+
+
+def _normalize(vector: np.array) -> np.array:
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return vector
+    return vector / norm
+
+
+def _bernstein(u: np.array) -> np.array:
+    """
+    Returns the (N, 4) array of cubic Bernstein polynomials
+    evaluated at the parameters u.
+    """
+    v = 1 - u
+    return np.stack((v**3, 3*u*v**2, 3*u**2*v, u**3), axis=-1)
+
+
+def _evaluate(bezier: np.array, u: np.array) -> np.array:
+    return _bernstein(u) @ bezier
+
+
+def _reparameterize(bezier: np.array, points: np.array, u: np.array, q: np.array):
+    """
+    Improves the parameters of the points through one Newton
+    step on the distance to the curve, given the offsets q of the
+    points on the curve from the points.
+    """
+    d1 = 3 * np.diff(bezier, axis=0)
+    d2 = 2 * np.diff(d1, axis=0)
+
+    v = 1 - u
+    q1 = (v**2)[:, None]*d1[0] + (2*u*v)[:, None]*d1[1] + (u**2)[:, None]*d1[2]
+    q2 = v[:, None]*d2[0] + u[:, None]*d2[1]
+
+    numerator = np.sum(q * q1, axis=1)
+    denominator = np.sum(q1 * q1 + q * q2, axis=1)
+
+    step = np.divide(
+        numerator, denominator,
+        out=np.zeros_like(u), where=denominator != 0
+    )
+    new_u = np.clip(u - step, 0.0, 1.0)
+
+    # Newton steps may diverge far from the curve, those are dropped.
+    new_q = _evaluate(bezier, new_u) - points
+    improved = np.sum(new_q**2, axis=1) < np.sum(q**2, axis=1)
+    return np.where(improved, new_u, u)
+
+
+def _fit_segment(points, tangent_1, tangent_2, u):
+    """
+    Least squares fit of a single cubic Bézier to the points
+    with fixed end tangents.
+    """
+    p0, p3 = points[0], points[-1]
+    basis = _bernstein(u)
+
+    a1 = basis[:, 1, None] * tangent_1
+    a2 = basis[:, 2, None] * tangent_2
+
+    c = np.array([
+        [np.sum(a1 * a1), np.sum(a1 * a2)],
+        [np.sum(a1 * a2), np.sum(a2 * a2)]
+    ])
+    tmp = points - np.outer(basis[:, 0] + basis[:, 1], p0) \
+        - np.outer(basis[:, 2] + basis[:, 3], p3)
+    x = np.array([np.sum(a1 * tmp), np.sum(a2 * tmp)])
+
+    length = np.linalg.norm(p3 - p0)
+    epsilon = 1e-6 * length
+
+    # Cramer's rule, much cheaper than the LAPACK solvers for a
+    # single 2x2 system.
+    det = c[0, 0] * c[1, 1] - c[0, 1] * c[1, 0]
+    if abs(det) > 1e-12:
+        alpha_1 = (x[0] * c[1, 1] - x[1] * c[0, 1]) / det
+        alpha_2 = (c[0, 0] * x[1] - c[1, 0] * x[0]) / det
+    else:
+        alpha_1 = alpha_2 = 0.0
+
+    if alpha_1 < epsilon or alpha_2 < epsilon:
+        alpha_1 = alpha_2 = length / 3
+
+    return np.array([
+        p0,
+        p0 + alpha_1 * tangent_1,
+        p3 + alpha_2 * tangent_2,
+        p3
+    ])
+
+
+def _chord_parameters(points: np.array) -> np.array:
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    u = np.concatenate(([0.0], np.cumsum(lengths)))
+    return u / u[-1]
+
+
+def fit_cubic_bezier(
+    points: np.array,
+    tolerance: float,
+    closed: bool = False,
+    iterations: int = 8
+) -> np.array:
+    """
+    Fits piecewise cubic Béziers to a polyline and returns an
+    (M, 4, 3) array with the control points of each segment.
+    The distance from every sample to the fitted curve is at
+    most tolerance.
+
+    The parameters of a segment are refined by at most iterations
+    Newton passes, and only while its fit is within 16 tolerances
+    and keeps improving. Other segments are split right away.
+    """
+    points = np.asarray(points, dtype=np.float64)
+
+    if len(points) > 1:
+        keep = np.any(np.diff(points, axis=0) != 0, axis=1)
+        points = points[np.concatenate(([True], keep))]
+
+    if closed and len(points) > 2:
+        if np.array_equal(points[0], points[-1]):
+            points = points[:-1]
+        tangent = _normalize(points[1] - points[-1])
+        points = np.vstack((points, points[:1]))
+        tangent_1, tangent_2 = tangent, -tangent
+    elif len(points) > 1:
+        tangent_1 = _normalize(points[1] - points[0])
+        tangent_2 = _normalize(points[-2] - points[-1])
+    else:
+        return np.empty((0, 4, 3))
+
+    beziers = []
+    stack = [(0, len(points) - 1, tangent_1, tangent_2)]
+    tolerance_2 = tolerance**2
+    refine_2 = 256 * tolerance_2
+
+    while stack:
+        first, last, tangent_1, tangent_2 = stack.pop()
+        segment = points[first:last + 1]
+
+        if len(segment) == 2:
+            length = np.linalg.norm(segment[1] - segment[0]) / 3
+            beziers.append(np.array([
+                segment[0],
+                segment[0] + length * tangent_1,
+                segment[1] + length * tangent_2,
+                segment[1]
+            ]))
+            continue
+
+        u = _chord_parameters(segment)
+        previous = refine_2
+        for idx in range(iterations + 1):
+            bezier = _fit_segment(segment, tangent_1, tangent_2, u)
+            q = _evaluate(bezier, u) - segment
+            error = np.sum(q * q, axis=1)
+            worst = error.max()
+
+            # Passes that gain less than a tenth are not worth it.
+            if worst <= tolerance_2 or worst > 0.9 * previous or idx == iterations:
+                break
+            previous = worst
+            u = _reparameterize(bezier, segment, u, q)
+
+        if worst <= tolerance_2:
+            beziers.append(bezier)
+            continue
+
+        split = first + 1 + int(np.argmax(error[1:-1]))
+        center = _normalize(points[split - 1] - points[split + 1])
+
+        # The stack is LIFO, so the right half is pushed first.
+        stack.append((split, last, -center, tangent_2))
+        stack.append((first, split, tangent_1, center))
+
+    return np.array(beziers)
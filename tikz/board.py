@@ -1,10 +1,40 @@
+import io
 import os
+import time
+import shutil
+import hashlib
+import tempfile
 import subprocess
-from .settings import BASE_DIR, BOARD_DIR, OUTPUT_DIR
+from . import settings
+from .cache import CompileCache
+from .preamble import PreambleFormats
+from .profile import RenderProfile, parse_log
 
 class Board:
-    directory = OUTPUT_DIR
-    objs = []
+    # Output folder, relative to the OUTPUT_DIR setting.
+    directory = ''
+
+    # When set, the points of every added object are stored in one
+    # contiguous array owned by the board.
+    buffered = False
+
+    # Number of decimal places of the rendered coordinates. When None,
+    # each object uses its own precision.
+    precision = None
+
+    # When set, every object keeps its TikZ line until it is modified,
+    # so boards rendered many times, like the frames of an animation,
+    # only render the objects that changed. Off by default, as the
+    # lines take as much memory as the whole document.
+    memoize = False
+
+    # Compiled outputs are reused when the generated document did not
+    # change. Set to None to always compile.
+    cache = CompileCache()
+
+    # The header is dumped into a precompiled format that later
+    # compiles start from. Set to None to load it on every compile.
+    formats = PreambleFormats()
 
     header = '\n'.join((
         r'\documentclass{standalone}',
@@ -21,46 +51,485 @@ class Board:
         r'\end{document}'
     ))
 
+    def __new__(cls, *args, **kw):
+        # The state of the board is set here, so subclasses whose
+        # __init__ does not call super().__init__() still have it.
+        self = super().__new__(cls)
+        self.objs = []
+        self.buffer = None
+        if self.buffered:
+            from .buffer import PointBuffer
+            self.buffer = PointBuffer()
+        self.digest = None
+        self.render_hits = 0
+        self.render_misses = 0
+
+        # RenderProfile of the last render, public: the time of each
+        # stage, the coordinates and bytes of TikZ code written for
+        # every class and top level object, and the pdflatex log
+        # statistics. See RenderProfile.format and to_dict.
+        self.profile = RenderProfile()
+        return self
+
     def add(self, *objs) -> None:
         self.objs.extend(objs)
+        if self.buffer is not None:
+            self.buffer.add(*objs)
     
     def construct(self):
         pass
 
-    def rename_file(self):
+    def prepare(self):
+        """
+        Constructs the board and applies the pending transforms.
+        """
+        with self.profile.stage('construct'):
+            self.construct()
+
+            if self.buffer is not None:
+                # Subobjects added to the objects after Board.add
+                # join the buffer here.
+                self.buffer.add(*self.objs)
+                self.buffer.materialize()
+
+    def get_output_path(self, suffix='pdf'):
         basename = self.__class__.__name__
-        src = os.path.join(BASE_DIR, 'board.pdf')
-        dst = os.path.join(OUTPUT_DIR, self.directory, f'{basename}.pdf')
+        return os.path.join(settings.OUTPUT_DIR, self.directory, f'{basename}.{suffix}')
+
+    def rename_file(self, build_dir=None, filename='board.pdf'):
+        if build_dir is None:
+            build_dir = settings.BASE_DIR
+        src = os.path.join(build_dir, filename)
+        dst = self.get_output_path()
 
         if os.path.exists(dst):
             os.remove(dst)
         
-        os.rename(src, dst)
+        shutil.move(src, dst)
 
-    def render(self) -> None:
-        filepath = os.path.join(BOARD_DIR, 'board.tex')
+    def render_lines(self):
+        """
+        Yields the LaTeX document piece by piece, so it can be
+        written without being held in memory.
+        """
+        yield self.header
+        yield '\n\n'
+        yield self.begin
+        yield '\n\n'
+        yield from self.render_body()
+        yield '\n\n'
+        yield self.end
 
-        self.construct()
+    def render_body(self):
+        """
+        Yields the lines of the objects, separated by newlines. With
+        memoize, the lines reused from the memoized code of unchanged
+        objects and those rendered again are counted in render_hits
+        and render_misses. The coordinates and bytes of every line
+        are counted in the profile.
+        """
+        from .object import TikzObject
 
-        code = '\n\n'.join((
-            self.header,
-            self.begin,
-            '\n'.join(obj.render() for obj in self.objs),
-            self.end
-        ))
+        hits, misses = TikzObject.render_hits, TikzObject.render_misses
 
-        with open(filepath, 'w+', encoding='utf-8') as f:
-            f.write(code)
+        profile = self.profile
+        profile.clear_objects()
 
-        print('Compiling LaTeX file.')
+        separator = ''
+        for idx, top in enumerate(self.objs):
+            for obj, line in top.render_items(self.precision, self.memoize):
+                profile.count_line(idx, top, obj, line)
+                yield separator
+                yield line
+                separator = '\n'
 
-        process = subprocess.Popen(
-            ['pdflatex', filepath], stdout=subprocess.DEVNULL)
-        process.communicate()
+        self.render_hits += TikzObject.render_hits - hits
+        self.render_misses += TikzObject.render_misses - misses
 
-        self.rename_file()
-        
-        if process.returncode == 0:
+    def render_report(self) -> str:
+        return (
+            f'Render cache: {self.render_hits} hits, '
+            f'{self.render_misses} misses.'
+        )
+
+    def write(self, sink, preamble=True) -> str:
+        """
+        Writes the LaTeX document into a file-like object and
+        returns its SHA-256 digest. Without preamble, the header is
+        left out of the file but still taken into the digest.
+        """
+        digest = hashlib.sha256()
+        for idx, chunk in enumerate(self.render_lines()):
+            # The header and its separator are the first two chunks.
+            if preamble or idx > 1:
+                sink.write(chunk)
+            digest.update(chunk.encode('utf-8'))
+        return digest.hexdigest()
+
+    def render(self, build_dir=None, previous=None) -> bool:
+        """
+        Constructs the board and compiles it, returning whether the
+        compilation succeeded. Unless build_dir is given, the LaTeX
+        files are kept in a temporary directory, so many boards can
+        be rendered at the same time. previous is the digest of the
+        last rendered document, which is not compiled again.
+        """
+        self.prepare()
+
+        if build_dir is not None:
+            return self.compile(build_dir, previous)
+
+        with tempfile.TemporaryDirectory(prefix='tikz-') as build_dir:
+            return self.compile(build_dir, previous)
+
+    def render_svg(self, text=None) -> bool:
+        """
+        Constructs the board and draws it directly as SVG, without
+        LaTeX. The text nodes are drawn by the given text strategy,
+        PlainText by default.
+        """
+        from .svg import SvgRenderer
+
+        self.prepare()
+
+        with self.profile.stage('svg'), \
+                open(self.get_output_path('svg'), 'w', encoding='utf-8') as f:
+            SvgRenderer(text).write(self.objs, f)
+        self.profile.count_objects(self.objs)
+
+        print('SVG written.')
+        return True
+
+    def render_png(self, resolution=None) -> bool:
+        """
+        Constructs the board and rasterizes it into a PNG preview,
+        without LaTeX. The resolution is given in pixels per
+        centimeter.
+        """
+        from .raster import RasterRenderer
+
+        self.prepare()
+
+        with self.profile.stage('png'), \
+                open(self.get_output_path('png'), 'wb') as f:
+            RasterRenderer(resolution).write(self.objs, f)
+        self.profile.count_objects(self.objs)
+
+        print('PNG preview written.')
+        return True
+
+    async def render_async(self, build_dir=None, previous=None, stages=None) -> bool:
+        """
+        Same as render, but pdflatex runs as an asyncio subprocess,
+        so other boards can be constructed and compiled meanwhile.
+        stages limits how many boards are in each stage at once.
+        """
+        from .pipeline import Stages
+
+        if stages is None:
+            stages = Stages()
+
+        self.prepare()
+
+        if build_dir is not None:
+            return await self.compile_async(build_dir, previous, stages)
+
+        with tempfile.TemporaryDirectory(prefix='tikz-') as build_dir:
+            return await self.compile_async(build_dir, previous, stages)
+
+    def write_body(self, build_dir, previous=None) -> str:
+        """
+        Writes the document, without the header, into build_dir.
+        Returns its path, or None when the PDF is already up to date.
+        """
+        body = os.path.join(build_dir, 'body.tex')
+
+        with self.profile.stage('tex'), \
+                open(body, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            self.digest = self.write(f, preamble=False)
+
+        if self.digest == previous and os.path.exists(self.get_output_path()):
+            print('Document unchanged since the last render.')
+            return None
+
+        if self.cache is not None:
+            if self.cache.fetch(self.digest, 'pdf', self.get_output_path()):
+                print('Document unchanged, reusing the cached PDF.')
+                return None
+
+        return body
+
+    def finish(self, build_dir, success) -> bool:
+        """
+        Stores the compiled PDF in the cache and moves it to the
+        output directory.
+        """
+        pdf = os.path.join(build_dir, 'board.pdf')
+        self.profile.read_log(os.path.join(build_dir, 'board.log'))
+
+        if success and self.cache is not None:
+            self.cache.store(self.digest, 'pdf', pdf)
+
+        if os.path.exists(pdf):
+            self.rename_file(build_dir)
+
+        if success:
             print('LaTeX compilation successful.')
         else:
-            print('LaTeX compilation failed.')
+            errors = self.profile.log.get('errors', [])
+            print(' '.join(['LaTeX compilation failed.'] + errors[:1]))
+
+        return success
+
+    def compile(self, build_dir, previous=None) -> bool:
+        """
+        Writes the document into build_dir, compiles it there and
+        moves the resulting PDF to the output directory.
+        """
+        body = self.write_body(build_dir, previous)
+        if body is None:
+            return True
+
+        print('Compiling LaTeX file.')
+
+        with self.profile.stage('pdflatex'):
+            success = compile_document(
+                self.header, body, build_dir, 'board', self.formats)
+
+        return self.finish(build_dir, success)
+
+    async def compile_async(self, build_dir, previous, stages) -> bool:
+        import asyncio
+        from .pipeline import compile_document_async
+
+        body = self.write_body(build_dir, previous)
+        if body is None:
+            return True
+
+        print('Compiling LaTeX file.')
+
+        with self.profile.stage('pdflatex'):
+            success = await compile_document_async(
+                self.header, body, build_dir, 'board', self.formats, stages)
+
+        async with stages.files:
+            return await asyncio.to_thread(self.finish, build_dir, success)
+
+
+def pdflatex_command(filepath, build_dir, jobname, fmt=None):
+    """
+    Returns the pdflatex command that compiles filepath, optionally
+    starting from the precompiled format fmt, and its environment.
+    """
+    command = [
+        'pdflatex',
+        '-interaction=nonstopmode',
+        f'-output-directory={build_dir}',
+        f'-jobname={jobname}'
+    ]
+    env = None
+
+    if fmt is not None:
+        directory, name = os.path.split(fmt)
+        command.append(f'-fmt={name}')
+        env = {**os.environ, 'TEXFORMATS': directory + os.pathsep}
+
+    return command + [filepath], env
+
+
+def run_pdflatex(filepath, build_dir, jobname, fmt=None) -> bool:
+    """
+    Runs pdflatex on filepath, optionally starting from the
+    precompiled format fmt, and returns whether it succeeded.
+    """
+    command, env = pdflatex_command(filepath, build_dir, jobname, fmt)
+    process = subprocess.run(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        env=env
+    )
+    return process.returncode == 0
+
+
+def write_document(header, body, filepath) -> None:
+    """
+    Writes the header followed by the body file into filepath.
+    """
+    with open(filepath, 'w', encoding='utf-8') as f, \
+            open(body, encoding='utf-8') as g:
+        f.write(header)
+        f.write('\n\n')
+        shutil.copyfileobj(g, f, 1 << 16)
+
+
+def compile_document(header, body, build_dir, jobname, formats=None) -> bool:
+    """
+    Compiles a document whose header was left out of the file body.
+    The header comes from its precompiled format when available,
+    otherwise it is prepended to the body.
+    """
+    fmt = formats.get(header) if formats is not None else None
+
+    if fmt is not None:
+        saved = formats.get_saved_time(fmt)
+        print(f'Using the precompiled preamble, about {saved:.2f}s saved.')
+        return run_pdflatex(body, build_dir, jobname, fmt)
+
+    filepath = os.path.join(build_dir, f'{jobname}.tex')
+    write_document(header, body, filepath)
+
+    return run_pdflatex(filepath, build_dir, jobname)
+
+
+def render_batch(boards, build_dir=None) -> list:
+    """
+    Renders many boards with a single pdflatex run per distinct
+    header. Each board becomes one page of a multi-page standalone
+    document, which is then split into the PDFs of the boards.
+    Returns whether each board succeeded.
+    """
+    if build_dir is None:
+        with tempfile.TemporaryDirectory(prefix='tikz-') as build_dir:
+            return render_batch(boards, build_dir)
+
+    for board in boards:
+        board.prepare()
+
+    groups = {}
+    for idx, board in enumerate(boards):
+        groups.setdefault(board.header, []).append(idx)
+
+    results = [False] * len(boards)
+    for number, (header, indices) in enumerate(groups.items()):
+        group_dir = os.path.join(build_dir, f'batch-{number}')
+        os.makedirs(group_dir)
+
+        group = [boards[idx] for idx in indices]
+        for idx, success in zip(indices, compile_batch(header, group, group_dir)):
+            results[idx] = success
+
+    return results
+
+
+def compile_batch(header, boards, build_dir) -> list:
+    """
+    Compiles boards that share the same header as the pages of a
+    single document. Falls back to compiling each board on its own
+    if the document fails.
+    """
+    body = os.path.join(build_dir, 'body.tex')
+    pending = []
+
+    with open(body, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.write('\\standaloneconfig{multi=tikzpicture}\n\n\\begin{document}\n\n')
+
+        for board in boards:
+            page = io.StringIO()
+            page.write(board.begin.replace(r'\begin{document}', '').strip())
+            page.write('\n\n')
+            with board.profile.stage('tex'):
+                digest = page_digest(board, page)
+            page.write('\n\n')
+            page.write(board.end.replace(r'\end{document}', '').strip())
+            page.write('\n\n')
+
+            board.digest = digest
+            if board.cache is not None:
+                if board.cache.fetch(digest, 'pdf', board.get_output_path()):
+                    continue
+
+            f.write(page.getvalue())
+            pending.append(board)
+
+        f.write('\\end{document}\n')
+
+    if not pending:
+        print('Documents unchanged, reusing the cached PDFs.')
+        return [True] * len(boards)
+
+    print(f'Compiling {len(pending)} boards in a single LaTeX run.')
+
+    # The run is shared, so every pending board reports its time
+    # and log.
+    formats = boards[0].formats
+    start = time.perf_counter()
+    compiled = compile_document(header, body, build_dir, 'batch', formats)
+    elapsed = time.perf_counter() - start
+
+    log = parse_log(os.path.join(build_dir, 'batch.log'))
+    for board in pending:
+        board.profile.timings['pdflatex (batch)'] = elapsed
+        board.profile.log = log
+
+    # A board drawing no picture, or many of them, would shift the
+    # pages of the boards after it.
+    success = compiled
+    if success and log.get('pages') != len(pending):
+        print(f'The batch has {log.get("pages")} pages for {len(pending)} boards.')
+        success = False
+
+    success = success and split_pages(build_dir)
+
+    if not success:
+        print('Batch compilation failed, compiling the boards one by one.')
+        results = {}
+        for idx, board in enumerate(pending):
+            board_dir = os.path.join(build_dir, f'board-{idx}')
+            os.makedirs(board_dir)
+            results[id(board)] = board.compile(board_dir)
+        return [results.get(id(board), True) for board in boards]
+
+    for idx, board in enumerate(pending, start=1):
+        filename = f'page-{idx}.pdf'
+        if board.cache is not None:
+            board.cache.store(
+                board.digest, 'pdf', os.path.join(build_dir, filename))
+        board.rename_file(build_dir, filename)
+
+    print('LaTeX compilation successful.')
+    return [True] * len(boards)
+
+
+def split_pages(build_dir) -> bool:
+    """
+    Splits the batch PDF into one file per page with pdfseparate,
+    returning whether it succeeded.
+    """
+    if shutil.which('pdfseparate') is None:
+        print('pdfseparate was not found.')
+        return False
+
+    try:
+        process = subprocess.run(
+            [
+                'pdfseparate',
+                os.path.join(build_dir, 'batch.pdf'),
+                os.path.join(build_dir, 'page-%d.pdf')
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL
+        )
+    except OSError:
+        return False
+
+    return process.returncode == 0
+
+
+def page_digest(board, sink) -> str:
+    """
+    Writes the body of the board into sink and returns the digest
+    of the standalone document of the board, as Board.write does.
+    """
+    digest = hashlib.sha256()
+    for chunk in (board.header, '\n\n', board.begin, '\n\n'):
+        digest.update(chunk.encode('utf-8'))
+
+    for chunk in board.render_body():
+        sink.write(chunk)
+        digest.update(chunk.encode('utf-8'))
+
+    for chunk in ('\n\n', board.end):
+        digest.update(chunk.encode('utf-8'))
+
+    return digest.hexdigest()
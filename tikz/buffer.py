@@ -0,0 +1,123 @@
+import numpy as np
+
+
+def walk(objs):
+    """
+    Yields the given objects and, recursively, their subobjects
+    and the members of groups.
+    """
+    for obj in objs:
+        kobjs = getattr(obj, 'kobjs', None)
+        if kobjs is not None:
+            yield from walk(kobjs)
+        else:
+            yield obj
+            yield from walk(obj.get_subobjs())
+
+
+def same_matrix(matrix_1, matrix_2):
+    if matrix_1 is None or matrix_2 is None:
+        return False
+    return matrix_1 is matrix_2 or np.array_equal(matrix_1, matrix_2)
+
+
+class PointBuffer:
+    """
+    Contiguous (N, 3) array holding the points of many objects.
+    The points of each object become a view into it, so transforms
+    shared by consecutive objects are applied with a single slice
+    operation.
+    """
+    def __init__(self, capacity=1024):
+        self.array = np.empty((capacity, 3))
+        self.size = 0
+        self.objs = []
+        self.views = []
+        self.ids = set()
+
+    def __len__(self):
+        return self.size
+
+    def add(self, *objs):
+        """
+        Moves the points of the objects and their subobjects into
+        the buffer.
+        """
+        for obj in walk(objs):
+            if id(obj) in self.ids:
+                continue
+
+            points = obj._points
+            length = len(points)
+            self.reserve(self.size + length)
+
+            view = self.array[self.size:self.size + length]
+            view[...] = points
+            obj._points = view
+
+            self.size += length
+            self.objs.append(obj)
+            self.views.append(view)
+            self.ids.add(id(obj))
+        return self
+
+    def reserve(self, capacity):
+        """
+        Grows the array to hold at least capacity points, moving
+        the views of the objects to the new storage.
+        """
+        if capacity <= len(self.array):
+            return
+
+        array = np.empty((max(capacity, 2 * len(self.array)), 3))
+        array[:self.size] = self.array[:self.size]
+
+        start = 0
+        for idx, (obj, view) in enumerate(zip(self.objs, self.views)):
+            stop = start + len(view)
+            new_view = array[start:stop]
+            if obj._points is view:
+                obj._points = new_view
+            self.views[idx] = new_view
+            start = stop
+
+        self.array = array
+
+    def materialize(self):
+        """
+        Applies the pending transforms of all objects. Consecutive
+        objects with the same pending matrix, as the members of a
+        transformed group have, are updated with one operation.
+        """
+        start = stop = 0
+        matrix = None
+        run = []
+
+        def flush():
+            if matrix is not None:
+                block = self.array[start:stop]
+                result = block @ matrix[:3, :3].T
+                result += matrix[:3, 3]
+                block[...] = result
+                for obj in run:
+                    obj._matrix = None
+                    obj._center = None
+
+        for obj, view in zip(self.objs, self.views):
+            length = len(view)
+
+            if obj._points is not view:
+                # The object replaced its points and left the buffer.
+                obj.materialize()
+            elif same_matrix(obj._matrix, matrix):
+                run.append(obj)
+                stop += length
+                continue
+
+            flush()
+            start, stop = stop, stop + length
+            matrix = obj._matrix if obj._points is view else None
+            run = [obj]
+
+        flush()
+        return self
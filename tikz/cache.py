@@ -0,0 +1,102 @@
+import os
+import time
+import shutil
+from contextlib import suppress
+from . import settings
+
+
+class CompileCache:
+    """
+    Content addressed store of compiled outputs. Entries are named
+    after the hash of the LaTeX document that produced them and
+    are evicted by age and by total size, least recently used
+    first. Without a directory, the CACHE_DIR setting is used.
+    """
+    def __init__(self, directory=None, max_size=512 * 2**20, max_age=30 * 86400):
+        self._directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            return settings.CACHE_DIR
+        return self._directory
+
+    @directory.setter
+    def directory(self, directory) -> None:
+        self._directory = directory
+
+    def path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.directory, f'{digest}.{suffix}')
+
+    def fetch(self, digest: str, suffix: str, dst: str) -> bool:
+        """
+        Copies the cached output to dst, returning whether it was
+        found.
+        """
+        src = self.path(digest, suffix)
+
+        try:
+            shutil.copyfile(src, dst)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+
+        # The modification time orders the entries for eviction. The
+        # entry may have been evicted by another process meanwhile.
+        with suppress(FileNotFoundError):
+            os.utime(src)
+        self.hits += 1
+        return True
+
+    def store(self, digest: str, suffix: str, src: str) -> None:
+        """
+        Adds a compiled output to the cache.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        dst = self.path(digest, suffix)
+        tmp = f'{dst}.{os.getpid()}.tmp'
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the entries older than max_age and then the least
+        recently used ones until the cache fits in max_size.
+        """
+        now = time.time()
+        entries = []
+
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.endswith('.tmp'):
+                continue
+            # Other processes sharing the cache may evict it first.
+            with suppress(FileNotFoundError):
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age:
+                    os.remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+
+def get_counts(cache) -> tuple:
+    """
+    Returns the hits and misses of the cache, zero without one.
+    """
+    if cache is None:
+        return 0, 0
+    return cache.hits, cache.misses
@@ -5,13 +5,19 @@ from .text import MathText
 from .utils import rotate, versor
 
 class Lines(TikzObject):
+    __slots__ = ()
+
     def __init__(self, *points, **kw) -> None:
         super().__init__(points, **kw)
     
 class Polygon(Lines):
+    __slots__ = ()
+
     closed = True
 
 class Rectangle(Polygon):
+    __slots__ = ()
+
     def __init__(self, base, height, **kw) -> None:
         points = [
             [base/2, height/2, 0],
@@ -22,6 +28,8 @@ class Rectangle(Polygon):
         super().__init__(*points, **kw)
 
 class RegularPolygon(Polygon):
+    __slots__ = ('side',)
+
     def __init__(self, num_of_sides, side=2.0, **kw) -> None:
         angle = 2 * np.pi / num_of_sides
         radius = side/(2*np.sin(angle/2))
@@ -38,21 +46,25 @@ class RegularPolygon(Polygon):
         return self
 
 class Square(RegularPolygon):
+    __slots__ = ()
+
     def __init__(self, side=2.0, **kw) -> None:
         super().__init__(4, side, **kw)
         self.rotate(np.pi/4)
     
 class Line(Lines):
+    __slots__ = ()
+
     def __init__(self, tail, head, **kw) -> None:
         super().__init__(tail, head, **kw)
     
     @property
     def tail(self):
-        return self.points[0]
+        return self.get_points()[0]
     
     @property
     def head(self):
-        return self.points[1]
+        return self.get_points()[1]
     
     def get_versor(self) -> np.array:
         v = self.head - self.tail
@@ -67,7 +79,7 @@ class Line(Lines):
     
     def mark_length(self, text, pos=0.5):
         normal = rotate(self.get_versor(), np.pi/2)
-        line = Line(self.tail, self.head, **self.kw)
+        line = Line(self.tail, self.head, **self.get_kw())
         line.shift(pos*normal).set_tips('<->')
         line.add_label(text, pos=0.3*pos/abs(pos))
 
@@ -91,15 +103,21 @@ class Line(Lines):
 
 
 class DashedLine(Line):
+    __slots__ = ()
+
     def __init__(self, tail, head, **kw) -> None:
         super().__init__(tail, head, dashed=True, **kw)
 
 
 class Arrow(Line):
+    __slots__ = ()
+
     def __init__(self, tail, head, **kw) -> None:
         super().__init__(tail, head, **kw)
         self.set_tips('-stealth')
 
 class Vector(Arrow):
+    __slots__ = ()
+
     def __init__(self, array, **kw) -> None:
         super().__init__([0.0, 0.0, 0.0], array, **kw)
@@ -2,45 +2,202 @@ from typing import Iterable, Union, Optional
 import numpy as np
 import copy
 
-from .properties import Points, Kwargs
-from .utils import rotate, to_array
+from .bezier import fit_cubic_bezier
+from .properties import (
+    Points, Kwargs, Style, EMPTY_STYLE, intern_style, to_points)
+from .utils import to_array, affine_matrix, rotation_matrix, format_points
+
+# Names of the slots of every object class, with those of its bases.
+SLOTS = {}
+
+MISSING = object()
+
+
+def get_slots(cls) -> tuple:
+    slots = SLOTS.get(cls)
+    if slots is None:
+        names = []
+        for class_ in cls.__mro__:
+            names.extend(
+                name for name in class_.__dict__.get('__slots__', ())
+                if name not in ('__dict__', '__weakref__')
+            )
+        slots = SLOTS[cls] = tuple(names)
+    return slots
+
 
 class TikzObject(Points, Kwargs):
+    # Large scenes hold many objects, so their attributes are kept
+    # in slots. Other attributes, as those of subclasses without
+    # slots, go to the instance dictionary, created on first use.
+    __slots__ = (
+        'version', '_points', '_matrix', '_center', '_hull', '_bounds',
+        '_kw', '_subobjs', '_rendered', '__dict__', '__weakref__'
+    )
+
     closed = False
     draw = True
 
+    # When set, the sampled points are rendered as piecewise cubic
+    # Béziers that deviate at most bezier_tolerance from them.
+    bezier_tolerance = None
+
+    # Number of decimal places of the rendered coordinates.
+    precision = 4
+
+    # Number of lines reused from the memoized TikZ code of the
+    # objects and rendered again while memoizing, by all objects.
+    render_hits = 0
+    render_misses = 0
+
+    def __new__(cls, *args, **kw):
+        # Defaults of the slots, set even when a subclass does not
+        # call TikzObject.__init__.
+        self = object.__new__(cls)
+        self.version = 0
+        self._matrix = None
+        self._center = None
+        self._hull = None
+        self._bounds = None
+        self._kw = EMPTY_STYLE
+        self._subobjs = None
+
+        # Memoized TikZ line of the object, with the key it was
+        # rendered for.
+        self._rendered = None
+        return self
+
     def __init__(self, points, **kw) -> None:
-        self.points = to_array(points)
-        self.kw = {x.replace('_', ' '): y for x, y in kw.items()}
-        self.subobjs = []
-    
+        self.points = to_points(points)
+        if kw:
+            self._kw = intern_style(kw, rename=True)
+
+    @property
+    def subobjs(self) -> list:
+        """
+        The object's subobjects. The list is created on first use.
+        """
+        if self._subobjs is None:
+            self._subobjs = []
+        return self._subobjs
+
+    @subobjs.setter
+    def subobjs(self, value):
+        self._subobjs = value
+
+    def get_subobjs(self):
+        """
+        Returns the object's subobjects for reading only.
+        """
+        return self._subobjs or ()
+
     def add_subobjs(self, *objs):
         self.subobjs.extend(objs)
         return self
 
     def copy(self):
-        copied_obj = copy.copy(self)
+        """
+        Returns a copy of the object and its subobjects. The copy
+        shares the points and the style with the object until
+        either one is modified.
+        """
+        cls = type(self)
+        copied_obj = object.__new__(cls)
+
+        for name in get_slots(cls):
+            value = getattr(self, name, MISSING)
+            if value is not MISSING:
+                setattr(copied_obj, name, value)
 
-        # Get a dictionary of all attributes
         attrs = vars(self)
+        if attrs:
+            copied_obj.__dict__.update(
+                {name: copy.copy(value) for name, value in attrs.items()})
 
-        # Copy each attribute dynamically
-        for attr_name, attr_value in attrs.items():
-            setattr(copied_obj, attr_name, copy.copy(attr_value))
+        points = getattr(self, '_points', None)
+        if points is not None and points.flags.writeable:
+            if points.base is None:
+                # Both objects copy the points before modifying them.
+                points.flags.writeable = False
+            else:
+                # Views, as those into a point buffer, are modified
+                # through their base.
+                copied_obj._points = points.copy()
+
+        if type(self._kw) is not Style:
+            copied_obj._kw = dict(self._kw)
 
-        copied_obj.subobjs = [obj.copy() for obj in copied_obj.subobjs]
+        if self._subobjs is not None:
+            copied_obj._subobjs = [obj.copy() for obj in self._subobjs]
 
         return copied_obj
+
+    def fit_bezier(self, tolerance=1e-3):
+        """
+        Renders the object as piecewise cubic Béziers fitted to
+        its points instead of a polyline.
+        """
+        self.bezier_tolerance = tolerance
+        return self
     
-    def render(self) -> str:
-        def point_to_str(point):
-            x, y, z = point
-            return f'({x}, {y}, {z})'
+    def get_options(self, precision: int) -> dict:
+        """
+        Returns the options that are passed to the TikZ path.
+        """
+        return self.get_kw()
+
+    def get_path(self, precision: int) -> str:
+        """
+        Returns the TikZ path operations that draw the object.
+        """
+        points = self.get_points()
+        if self.bezier_tolerance is not None and len(points) > 2:
+            path = self.get_bezier_path(precision)
+            if path is not None:
+                return path
+
+        path = ' -- '.join(format_points(points, precision))
+
+        if self.closed:
+            path += ' -- cycle'
+
+        return path
+
+    def get_bezier_path(self, precision: int) -> str:
+        """
+        Returns the TikZ path of the Béziers fitted to the object, or
+        None when it has fewer than two distinct points.
+        """
+        beziers = fit_cubic_bezier(
+            self.get_points(), self.bezier_tolerance, closed=self.closed)
+        if len(beziers) == 0:
+            return None
+
+        points = np.vstack((beziers[0, :1], beziers[:, 1:].reshape(-1, 3)))
+        coords = format_points(points, precision, collapse=False)
+
+        path = [coords[0]]
+        for idx in range(1, len(coords), 3):
+            control_1, control_2, end = coords[idx:idx + 3]
+            path.append(f'.. controls {control_1} and {control_2} .. {end}')
 
-        points = ' -- '.join(point_to_str(x) for x in self.points)
-        
         if self.closed:
-            points += ' -- cycle'
+            path.append('-- cycle')
+
+        return ' '.join(path)
+
+    def get_render_key(self, precision: int) -> tuple:
+        """
+        Returns what the TikZ code of the object depends on, besides
+        the version bumped by its transforms and setters.
+        """
+        return (self.version, precision, self.draw, self.closed, self.bezier_tolerance)
+
+    def render_line(self, precision: int) -> str:
+        """
+        Returns the TikZ line that draws the object alone.
+        """
+        path = self.get_path(precision)
 
         def kw_to_str(key, value):
             if value is True:
@@ -48,7 +205,8 @@ class TikzObject(Points, Kwargs):
             else:
                 return f'{key}={value}'
         
-        kw = ', '.join(kw_to_str(x, y) for x, y in self.kw.items())
+        options = self.get_options(precision)
+        kw = ', '.join(kw_to_str(x, y) for x, y in options.items())
         if kw != '':
             kw = f'[{kw}]'
 
@@ -57,27 +215,77 @@ class TikzObject(Points, Kwargs):
         else:
             action = '\\path'
         
-        subobjs = [obj.render() for obj in self.subobjs]
-        return '\n'.join([f'{action}{kw} {points};', *subobjs])
+        return f'{action}{kw} {path};'
+
+    def render_items(self, precision: int = None, memoize=False):
+        """
+        Yields the TikZ lines that draw the object and, after it,
+        its subobjects, each with the object it draws. Subclasses
+        that override render are drawn by it instead, with their
+        own precision.
+        """
+        if type(self).render is not TikzObject.render:
+            yield self, self.render()
+        else:
+            yield from self._render_items(precision, memoize)
+
+    def _render_items(self, precision: int = None, memoize=False):
+        """
+        Yields the items of render_items. With memoize, the line of
+        the object is kept until the object is modified, which
+        holds as much memory as the code itself.
+        """
+        if precision is None:
+            precision = self.precision
+
+        if not memoize:
+            yield self, self.render_line(precision)
+        else:
+            key = self.get_render_key(precision)
+            rendered = self._rendered
+
+            if rendered is not None and rendered[0] == key:
+                TikzObject.render_hits += 1
+                yield self, rendered[1]
+            else:
+                TikzObject.render_misses += 1
+                line = self.render_line(precision)
+                self._rendered = (key, line)
+                yield self, line
+
+        for obj in self.get_subobjs():
+            yield from obj.render_items(precision, memoize)
+
+    def render(self, precision: int = None) -> str:
+        return '\n'.join(line for _, line in self._render_items(precision))
 
 class Union(TikzObject):
+    __slots__ = ()
+
     def __init__(self, *kobjs, **kw) -> None:
-        points = np.vstack([obj.points for obj in kobjs])
+        points = np.vstack([obj.get_points() for obj in kobjs])
         super().__init__(points, **kw)
         for obj in kobjs:
-            self.subobjs += obj.subobjs
+            self.add_subobjs(*obj.get_subobjs())
 
 class Group(TikzObject):
+    __slots__ = ('kobjs',)
+
     def __init__(self, *kobjs) -> None:
         self.kobjs = kobjs
 
     def copy(self):
-        return type(self)(*[kobj.copy() for kobj in self.kobjs])
+        copied_obj = super().copy()
+        copied_obj.kobjs = type(self.kobjs)(kobj.copy() for kobj in self.kobjs)
+        return copied_obj
     
-    def shift(self, array):
+    def apply_matrix(self, matrix):
         for kobj in self.kobjs:
-            kobj.shift(array)
+            kobj.apply_matrix(matrix)
         return self
+
+    def shift(self, array):
+        return self.apply_matrix(affine_matrix(offset=to_array(array)))
     
     def move_to(self, array):
         for kobj in self.kobjs:
@@ -85,11 +293,19 @@ class Group(TikzObject):
         return self
     
     def linear_transform(self, array, about_point=None):
+        if about_point is not None:
+            return self.apply_matrix(
+                affine_matrix(to_array(array), about_point=about_point))
+
         for kobj in self.kobjs:
-            kobj.transform(array, about_point)
+            kobj.linear_transform(array, about_point)
         return self
     
-    def scale(self, num):
+    def scale(self, num, about_point=None):
+        if about_point is not None:
+            return self.apply_matrix(
+                affine_matrix(num * np.eye(3), about_point=about_point))
+
         for kobj in self.kobjs:
             kobj.scale(num)
         return self
@@ -97,13 +313,13 @@ class Group(TikzObject):
     def rotate(self, angle, axis=(0.0, 0.0, 1.0), about_point=None):
         if about_point is None:
             about_point = np.mean(
-                [kobj.get_center() for kobj in self.kobjs])
+                [kobj.get_center() for kobj in self.kobjs], axis=0)
         else:
             about_point = np.array(about_point, dtype=np.float64)
         
-        for kobj in self.kobjs:
-            kobj.rotate(angle, axis, about_point)
-        return self
+        return self.apply_matrix(
+            affine_matrix(rotation_matrix(angle, axis), about_point=about_point))
     
-    def render(self):
-        return '\n'.join(x.render() for x in self.kobjs)
+    def _render_items(self, precision: int = None, memoize=False):
+        for kobj in self.kobjs:
+            yield from kobj.render_items(precision, memoize)
@@ -1,27 +1,35 @@
 import numpy as np
 from .object import TikzObject
-from .shape import Shape
+from .shape import Shape, Parametric
 from .lines import Line, Arrow
 from .arcs import Circle, Dot
 
 
 class Throw(Shape):
+    __slots__ = ()
+
     def __init__(self, velocity, gravity, time, **kw) -> None:
         velocity = np.array(velocity, dtype=np.float64)
         gravity = np.array(gravity, dtype=np.float64)
 
         def parametric(t):
+            t = np.asarray(t, dtype=np.float64)[..., None]
             return velocity * t + gravity * t**2/2
-        super().__init__(parametric, 0.0, time, **kw)
+        super().__init__(
+            Parametric(parametric, vectorized=True), 0.0, time, **kw)
 
 
 class Pulley(Circle):
+    __slots__ = ()
+
     def __init__(self, radius=1, **kw) -> None:
         super().__init__(radius=radius, **kw)
         self.add_subobjs(Dot([0.0, 0.0, 0.0]))
 
 
 class HoldedPulley(Pulley):
+    __slots__ = ()
+
     def __init__(self, center, radius=1, **kw) -> None:
         super().__init__(radius=radius, **kw)
         self.shift(center)
@@ -35,6 +43,8 @@ class HoldedPulley(Pulley):
 
 
 class LightRay(Line):
+    __slots__ = ()
+
     def __init__(self, tail, head, **kw) -> None:
         mid = (tail + head)/2
         direction = head - tail
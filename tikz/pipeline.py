@@ -0,0 +1,133 @@
+import os
+import time
+import asyncio
+import subprocess
+from .board import pdflatex_command, write_document
+
+
+class Stages:
+    """
+    Concurrency limits of the stages of the asyncio pipeline. While
+    a board is being constructed, the boards before it are compiled
+    by pdflatex and converted to svg, each stage running at most its
+    limit of processes.
+    """
+    def __init__(self, latex=None, convert=None, files=4):
+        workers = os.cpu_count() or 1
+        self.latex = asyncio.Semaphore(latex or workers)
+        self.convert = asyncio.Semaphore(convert or workers)
+        self.files = asyncio.Semaphore(files)
+
+        # Only one render dumps the precompiled format of a header.
+        self.formats = asyncio.Lock()
+
+
+async def run_process(command, env=None) -> bool:
+    """
+    Runs a command as an asyncio subprocess and returns whether it
+    succeeded.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            env=env
+        )
+    except FileNotFoundError:
+        return False
+
+    return await process.wait() == 0
+
+
+async def compile_document_async(header, body, build_dir, jobname, formats, stages) -> bool:
+    """
+    Same as compile_document, waiting on pdflatex without blocking
+    the event loop.
+    """
+    fmt = None
+    if formats is not None:
+        async with stages.formats:
+            fmt = await asyncio.to_thread(formats.get, header)
+
+    if fmt is not None:
+        saved = formats.get_saved_time(fmt)
+        print(f'Using the precompiled preamble, about {saved:.2f}s saved.')
+        filepath = body
+    else:
+        filepath = os.path.join(build_dir, f'{jobname}.tex')
+        write_document(header, body, filepath)
+
+    command, env = pdflatex_command(filepath, build_dir, jobname, fmt)
+    async with stages.latex:
+        return await run_process(command, env)
+
+
+def inkscape_command(basename):
+    return [
+        'inkscape',
+        '--export-type=svg',
+        '--pdf-poppler',
+        '-l',
+        f'{basename}.pdf'
+    ]
+
+
+async def convert_to_svg_async(board, stages) -> bool:
+    """
+    Converts the PDF of a rendered board to svg with Inkscape.
+    """
+    basename = os.path.splitext(board.get_output_path())[0]
+    cache, digest = board.cache, board.digest
+
+    if cache is not None and digest is not None:
+        if cache.fetch(digest, 'svg', f'{basename}.svg'):
+            print('Document unchanged, reusing the cached svg.')
+            return True
+
+    async with stages.convert:
+        success = await run_process(inkscape_command(basename))
+
+    if success:
+        if cache is not None and digest is not None:
+            async with stages.files:
+                await asyncio.to_thread(cache.store, digest, 'svg', f'{basename}.svg')
+        print('Conversion to svg successful.')
+    else:
+        print('Conversion to svg failed.')
+
+    return success
+
+
+async def render_pipeline(boards, stages=None, svg=False) -> list:
+    """
+    Renders the boards concurrently. Each board is constructed while
+    the previous ones compile and convert. Returns, for every board,
+    its success, elapsed time and error message, if any.
+    """
+    if stages is None:
+        stages = Stages()
+
+    start = time.perf_counter()
+
+    async def render(board):
+        try:
+            success = await board.render_async(stages=stages)
+            if success and svg:
+                with board.profile.stage('svg conversion'):
+                    success = await convert_to_svg_async(board, stages)
+            error = None if success else 'compilation failed'
+        except Exception as exc:
+            success = False
+            error = f'{type(exc).__name__}: {exc}'
+        return success, time.perf_counter() - start, error
+
+    tasks = []
+    for board in boards:
+        tasks.append(asyncio.ensure_future(render(board)))
+
+        # Lets the new task construct its board and start pdflatex
+        # before the next board is constructed.
+        await asyncio.sleep(0)
+
+    return await asyncio.gather(*tasks)
@@ -0,0 +1,121 @@
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from . import settings
+
+
+class PreambleFormats:
+    """
+    Precompiled LaTeX formats holding the board headers. A format
+    is dumped once per distinct header, so later compiles skip
+    loading the document class and packages. Without a directory,
+    the formats are kept in the formats folder of the CACHE_DIR
+    setting.
+    """
+    def __init__(self, directory=None):
+        self._directory = directory
+        self.failed = set()
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            return os.path.join(settings.CACHE_DIR, 'formats')
+        return self._directory
+
+    @directory.setter
+    def directory(self, directory) -> None:
+        self._directory = directory
+
+    def get_name(self, header: str) -> str:
+        digest = hashlib.sha256(header.encode('utf-8'))
+
+        # Formats can only be loaded by the binary that dumped them.
+        executable = shutil.which('pdflatex')
+        if executable is not None:
+            digest.update(f'{executable}:{os.stat(executable).st_mtime}'.encode())
+
+        return f'preamble-{digest.hexdigest()[:16]}'
+
+    def get(self, header: str):
+        """
+        Returns the path, without extension, of the format of the
+        header, dumping it when needed. Returns None if the format
+        could not be created.
+        """
+        name = self.get_name(header)
+        path = os.path.join(self.directory, name)
+
+        if os.path.exists(f'{path}.fmt'):
+            return path
+        if name in self.failed:
+            return None
+
+        return self.dump(header, name)
+
+    def dump(self, header: str, name: str):
+        """
+        Dumps the header into a format, returning its path without
+        extension.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+
+        with tempfile.TemporaryDirectory(prefix='tikz-') as build_dir:
+            source = os.path.join(build_dir, f'{name}.tex')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write(header)
+                f.write('\n\\dump\n')
+
+            print('Precompiling the preamble.')
+
+            start = time.perf_counter()
+            try:
+                process = subprocess.run(
+                    [
+                        'pdflatex',
+                        '-ini',
+                        '-interaction=nonstopmode',
+                        f'-jobname={name}',
+                        f'-output-directory={build_dir}',
+                        '&pdflatex',
+                        source
+                    ],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL
+                )
+                returncode = process.returncode
+            except OSError:
+                # pdflatex is missing or could not be started.
+                returncode = None
+            elapsed = time.perf_counter() - start
+
+            fmt = os.path.join(build_dir, f'{name}.fmt')
+            if returncode != 0 or not os.path.exists(fmt):
+                print('Precompiling the preamble failed, compiling from scratch.')
+                self.failed.add(name)
+                return None
+
+            # Moved in two steps so concurrent renders never load a
+            # partially copied format.
+            tmp = f'{path}.{os.getpid()}.tmp'
+            shutil.move(fmt, tmp)
+            os.replace(tmp, f'{path}.fmt')
+
+        with open(f'{path}.time', 'w') as f:
+            f.write(str(elapsed))
+
+        return path
+
+    def get_saved_time(self, path: str) -> float:
+        """
+        Returns the time it takes to load the preamble from scratch,
+        which is what every compile using the format saves.
+        """
+        try:
+            with open(f'{path}.time') as f:
+                return float(f.read())
+        except (OSError, ValueError):
+            return 0.0
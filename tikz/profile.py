@@ -0,0 +1,159 @@
+import re
+import time
+from contextlib import contextmanager
+
+_PAGES = re.compile(r'Output written on .*? \((\d+) pages?, (\d+) bytes\)', re.S)
+_MEMORY = re.compile(r'(\d+) words of memory out of (\d+)')
+_STRINGS = re.compile(r'(\d+) strings out of (\d+)')
+_CAPACITY = re.compile(r'TeX capacity exceeded, sorry \[([^\]]*)\]')
+
+# A coordinate written by format_points, with two or three numbers.
+_COORDINATE = re.compile(r'\(-?[\d.]+(?:, -?[\d.]+){1,2}\)')
+
+
+def parse_log(path: str) -> dict:
+    """
+    Reads the statistics of a pdflatex log: the pages and size of
+    the PDF, the main memory and strings used, the capacity that
+    was exceeded and the error messages.
+    """
+    try:
+        with open(path, encoding='latin-1') as f:
+            log = f.read()
+    except OSError:
+        return {}
+
+    stats = {}
+
+    match = _PAGES.search(log)
+    if match is not None:
+        stats['pages'] = int(match.group(1))
+        stats['pdf_bytes'] = int(match.group(2))
+
+    match = _MEMORY.search(log)
+    if match is not None:
+        stats['main_memory'] = int(match.group(1))
+        stats['main_memory_limit'] = int(match.group(2))
+
+    match = _STRINGS.search(log)
+    if match is not None:
+        stats['strings'] = int(match.group(1))
+        stats['strings_limit'] = int(match.group(2))
+
+    match = _CAPACITY.search(log)
+    if match is not None:
+        stats['capacity_exceeded'] = match.group(1)
+
+    errors = [line for line in log.splitlines() if line.startswith('! ')]
+    if errors:
+        stats['errors'] = errors
+
+    return stats
+
+
+class RenderProfile:
+    """
+    Report of a board render: the time spent in each stage, the
+    coordinates and bytes of TikZ code written for every object
+    class and top level object, and the statistics of the
+    pdflatex log.
+    """
+    def __init__(self):
+        self.timings = {}
+        self.classes = {}
+        self.objects = []
+        self.log = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Adds the time spent in the block to the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def clear_objects(self) -> None:
+        self.classes = {}
+        self.objects = []
+
+    def count_line(self, idx: int, top, obj, line: str) -> None:
+        """
+        Counts the coordinates and the bytes of a TikZ line that
+        draws obj, part of the top level object top at index idx.
+        """
+        coordinates = len(_COORDINATE.findall(line))
+        size = len(line.encode('utf-8')) + 1
+
+        counts = self.classes.setdefault(type(obj).__name__, [0, 0, 0])
+        counts[0] += 1
+        counts[1] += coordinates
+        counts[2] += size
+
+        if self.objects and self.objects[-1][0] == idx:
+            counts = self.objects[-1]
+            counts[2] += coordinates
+            counts[3] += size
+        else:
+            self.objects.append([idx, type(top).__name__, coordinates, size])
+
+    def count_objects(self, objs) -> None:
+        """
+        Counts the objects drawn by a backend that writes no TikZ
+        code, leaving their coordinates and bytes at zero.
+        """
+        from .buffer import walk
+
+        self.clear_objects()
+        for obj in walk(objs):
+            counts = self.classes.setdefault(type(obj).__name__, [0, 0, 0])
+            counts[0] += 1
+
+    def read_log(self, path: str) -> None:
+        self.log = parse_log(path)
+
+    def to_dict(self) -> dict:
+        return {
+            'timings': dict(self.timings),
+            'classes': {
+                name: dict(zip(('objects', 'coordinates', 'bytes'), counts))
+                for name, counts in self.classes.items()
+            },
+            'objects': [
+                dict(zip(('index', 'class', 'coordinates', 'bytes'), obj))
+                for obj in self.objects
+            ],
+            'log': dict(self.log),
+        }
+
+    def format(self, top: int = 10) -> str:
+        """
+        Returns the report as text, listing the top objects that
+        emitted the most bytes.
+        """
+        lines = ['Stage timings:']
+        for stage, seconds in self.timings.items():
+            lines.append(f'  {stage:18} {seconds*1e3:10.2f}ms')
+
+        lines.append(f'{"Per class:":19} {"objects":>8} {"coordinates":>11} {"bytes":>10}')
+        classes = sorted(self.classes.items(), key=lambda x: (-x[1][2], -x[1][0]))
+        for name, (count, coordinates, size) in classes:
+            lines.append(f'  {name:16} {count:9} {coordinates:11} {size:10}')
+
+        if self.objects:
+            lines.append(f'{f"Top {top} objects:":18} {"class":11} {"coordinates":>11} {"bytes":>10}')
+            objects = sorted(self.objects, key=lambda x: -x[3])[:top]
+            for idx, name, coordinates, size in objects:
+                lines.append(f'  #{idx:<15} {name:11} {coordinates:11} {size:10}')
+
+        if self.log:
+            lines.append('pdflatex:')
+            for key, value in self.log.items():
+                if key == 'errors':
+                    value = ' | '.join(value[:3])
+                lines.append(f'  {key:18} {value}')
+
+        return '\n'.join(lines)
@@ -1,65 +1,257 @@
 from typing import Iterable, Union, Optional
+import sys
+import itertools
 import numpy as np
-from .utils import rotate, reflect, to_array, proj
+from .utils import (
+    to_array, proj, affine_matrix, rotation_matrix, reflection_matrix,
+    convex_hull)
 from .constants import OUT
 
 
-class Points:
+# Versions are drawn from one counter, so two objects never share a
+# version unless one is a copy of the other.
+VERSIONS = itertools.count(1)
+
+# Names of the options, with the underscores of the keyword arguments
+# replaced by spaces, shared by every object.
+OPTION_NAMES = {}
+
+# Styles shared by the objects with the same options. The registry
+# is emptied when it grows past MAX_STYLES, the objects keep theirs.
+STYLES = {}
+MAX_STYLES = 4096
+
+
+def get_option_name(key: str) -> str:
+    name = OPTION_NAMES.get(key)
+    if name is None:
+        name = OPTION_NAMES[key] = sys.intern(key.replace('_', ' '))
+    return name
+
+
+class Style(dict):
+    """
+    Options shared by every object with the same style. Objects
+    do not modify it in place, they copy it first.
+    """
+    __slots__ = ()
+
+
+def intern_style(options: dict, rename: bool = False) -> dict:
+    """
+    Returns the shared style with the given options, named after
+    the keyword arguments when rename is set. Options with
+    unhashable values are not shared.
+    """
+    if not options:
+        return EMPTY_STYLE
+
+    values = tuple(options.values())
+    try:
+        # The types tell apart options like dashed=True and dashed=1,
+        # which are equal but rendered differently.
+        key = (rename, tuple(options), values, tuple(map(type, values)))
+        style = STYLES.get(key)
+    except TypeError:
+        key = style = None
+
+    if style is None:
+        if rename:
+            options = {get_option_name(x): y for x, y in options.items()}
+        if key is None:
+            return dict(options)
+
+        if len(STYLES) >= MAX_STYLES:
+            STYLES.clear()
+        style = STYLES[key] = Style(options)
+    return style
+
+
+EMPTY_STYLE = Style()
+
+
+def to_points(points) -> np.array:
+    """
+    Returns the points as an array. Read only arrays, as the shared
+    sampling templates, are kept and only copied when modified.
+    """
+    if (
+        type(points) is np.ndarray
+        and points.dtype == np.float64
+        and not points.flags.writeable
+    ):
+        return points
+    return to_array(points)
+
+
+class Versioned:
+    # The version changes with every modification of the object,
+    # keying the memoized TikZ code of the object.
+    __slots__ = ()
+
+    def touch(self):
+        """
+        Marks the object as modified. Needed after changing its
+        points or kw in place.
+        """
+        self.version = next(VERSIONS)
+        return self
+
+
+class Points(Versioned):
+    # Transforms are composed into a pending 4x4 affine matrix,
+    # _matrix, and only applied to the points when they are needed.
+    #
+    # _hull holds the indices of the points on the convex hull, which
+    # affine maps preserve, so only replacing the points invalidates
+    # them. _bounds is the bounding box with the version it was
+    # computed at.
+    __slots__ = ()
+
+    @property
+    def points(self) -> np.array:
+        """
+        The object's points, with the pending transform applied.
+        """
+        self.materialize()
+        # The caller may modify the returned array in place.
+        if not self._points.flags.writeable:
+            self._points = self._points.copy()
+        self._center = None
+        self._hull = None
+        self.touch()
+        return self._points
+
+    @points.setter
+    def points(self, value):
+        self._points = value
+        self._matrix = None
+        self._center = None
+        self._hull = None
+        self.touch()
+
+    def get_points(self) -> np.array:
+        """
+        Returns the object's points for reading only, so the object
+        is not marked as modified.
+        """
+        return self.materialize()._points
+
+    def materialize(self):
+        """
+        Applies the pending transform to the object's points.
+        """
+        matrix = self._matrix
+        if matrix is not None:
+            self._matrix = None
+            points = self._points @ matrix[:3, :3].T + matrix[:3, 3]
+            if self._points.flags.writeable:
+                self._points[...] = points
+            else:
+                # Shared arrays are replaced instead of modified.
+                self._points = points
+            if self._center is not None:
+                self._center = matrix[:3, :3] @ self._center + matrix[:3, 3]
+        return self
+
     def get_center(self) -> np.array:
         """
         Property that returns the object's center.
         """
-        return np.mean(self.points, axis=0)
+        if self._center is None:
+            self._center = np.mean(self._points, axis=0)
+
+        # The mean commutes with affine maps, so the pending
+        # transform does not need to be applied to every point.
+        matrix = self._matrix
+        if matrix is None:
+            return self._center.copy()
+        return matrix[:3, :3] @ self._center + matrix[:3, 3]
+
+    def get_hull(self) -> np.array:
+        """
+        Returns the points on the object's convex hull, with the
+        pending transform applied.
+        """
+        if self._hull is None:
+            self._hull = convex_hull(self._points)
+
+        vertices = self._points[self._hull]
+        matrix = self._matrix
+        if matrix is not None:
+            vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+        return vertices
+
+    def get_bounds(self) -> tuple:
+        """
+        Returns the lower and upper corners of the object's
+        axis-aligned bounding box.
+        """
+        bounds = self._bounds
+        if bounds is None or bounds[0] != self.version:
+            if self._hull is None:
+                vertices = self.get_points()
+            else:
+                vertices = self.get_hull()
+            bounds = self._bounds = (
+                self.version, vertices.min(axis=0), vertices.max(axis=0))
+        return bounds[1], bounds[2]
 
     def get_top(self):
         """
         Property that returns the object's top.
         """
-        return np.max(self.points[:, 1])
+        return self.get_bounds()[1][1]
 
     def get_bottom(self):
         """
         Property that returns the object's bottom.
         """
-        return np.min(self.points[:, 1])
+        return self.get_bounds()[0][1]
 
     def get_left(self):
         """
         Property that returns the object's left.
         """
-        return np.min(self.points[:, 0])
+        return self.get_bounds()[0][0]
 
     def get_right(self):
         """
         Property that returns the object's right.
         """
-        return np.max(self.points[:, 0])
+        return self.get_bounds()[1][0]
 
     def get_extreme(self, direction: Iterable) -> np.array:
         """
         Receives a vector denoting a direction and returns the
         farthermost point on that direction.
         """
-        cache = float('-inf')
+        vertices = self.get_hull()
+        return vertices[np.argmax(vertices @ direction)]
 
-        for vector in self.points:
-            value = np.dot(direction, vector)
-            if cache < value:
-                cache = value
-                max_vector = vector
+    def apply_matrix(self, matrix: np.array):
+        """
+        Applies an affine transformation, given by a 4x4 matrix in
+        homogeneous coordinates, to the object and recursively to
+        its subobjects. The points themselves are only updated
+        when materialized.
+        """
+        if self._matrix is None:
+            self._matrix = matrix
+        else:
+            self._matrix = matrix @ self._matrix
+        self.touch()
 
-        return max_vector
+        for obj in self.get_subobjs():
+            obj.apply_matrix(matrix)
+        return self
 
     def shift(self, vector: Iterable[Union[int, float]]):
         """
         Shift the object and it's subobjects through a given
         vector.
         """
-        vector = to_array(vector)
-        self.points += vector
-        for obj in self.subobjs:
-            obj.shift(vector)
-        return self
+        return self.apply_matrix(affine_matrix(offset=to_array(vector)))
 
     def move_to(self, vector: Iterable[Union[int, float]]):
         """
@@ -93,15 +285,8 @@ class Points:
         if about_point is None:
             about_point = self.get_center()
 
-        self.shift(-about_point)
-        for idx, point in enumerate(self.points):
-            self.points[idx] = np.dot(point, array.T)
-        self.shift(about_point)
-
-        for obj in self.subobjs:
-            obj.linear_transform(array, about_point=about_point)
-
-        return self
+        return self.apply_matrix(
+            affine_matrix(to_array(array), about_point=about_point))
 
     def scale(self, num: float, about_point=None):
         """
@@ -110,14 +295,8 @@ class Points:
         if about_point is None:
             about_point = self.get_center()
 
-        self.shift(-about_point)
-        self.points *= num
-        self.shift(about_point)
-
-        for obj in self.subobjs:
-            obj.scale(num, about_point=about_point)
-
-        return self
+        return self.apply_matrix(
+            affine_matrix(num * np.eye(3), about_point=about_point))
 
     def rotate(
         self,
@@ -132,15 +311,8 @@ class Points:
         if about_point is None:
             about_point = self.get_center()
 
-        self.shift(-about_point)
-        for idx, point in enumerate(self.points):
-            self.points[idx] = rotate(point, angle, axis)
-        self.shift(about_point)
-
-        for obj in self.subobjs:
-            obj.rotate(angle, axis=axis, about_point=about_point)
-
-        return self
+        return self.apply_matrix(
+            affine_matrix(rotation_matrix(angle, axis), about_point=about_point))
 
     def reflect(self, normal, about_point=None):
         """
@@ -148,38 +320,62 @@ class Points:
         """
         if about_point is None:
             about_point = self.get_center()
-        else:
-            about_point = np.array(about_point, dtype=np.float64)
 
-        self.shift(-about_point)
-        for idx, point in enumerate(self.points):
-            self.points[idx] = reflect(point, normal, about_point)
-        self.shift(about_point)
+        return self.apply_matrix(
+            affine_matrix(reflection_matrix(normal), about_point=about_point))
 
-        for obj in self.subobjs:
-            obj.reflect(normal, about_point=about_point)
 
-        return self
+class Kwargs(Versioned):
+    # The options are kept in _kw, usually a style shared with other
+    # objects.
+    __slots__ = ()
+
+    @property
+    def kw(self) -> dict:
+        """
+        The options of the object's TikZ path.
+        """
+        # The caller may modify the returned dict in place.
+        if type(self._kw) is Style:
+            self._kw = dict(self._kw)
+        self.touch()
+        return self._kw
+
+    @kw.setter
+    def kw(self, value):
+        self._kw = value
+        self.touch()
+
+    def get_kw(self) -> dict:
+        """
+        Returns the object's options for reading only.
+        """
+        return self._kw
 
+    def set_option(self, key, value):
+        """
+        Sets an option of the object's TikZ path.
+        """
+        if type(self._kw) is Style:
+            self._kw = intern_style({**self._kw, key: value})
+        else:
+            self._kw[key] = value
+        return self.touch()
 
-class Kwargs:
     def set_color(self, color):
         """
         Sets the color of the line that draws the object.
         """
-        self.kw['color'] = color
-        return self
+        return self.set_option('color', color)
 
     def set_fill(self, color):
         """
         Sets the object's color.
         """
-        self.kw['fill'] = color
-        return self
+        return self.set_option('fill', color)
 
     def set_tips(self, tip):
         """
         Sets the tips of the lines that constitute the object.
         """
-        self.kw[tip] = True
-        return self
+        return self.set_option(tip, True)
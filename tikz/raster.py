@@ -0,0 +1,361 @@
+import zlib
+import struct
+import numpy as np
+
+from .buffer import walk
+from .text import Text
+from .arcs import EllipticalArc
+from .svg import get_style
+
+
+def write_png(image: np.array, sink) -> None:
+    """
+    Writes an (H, W, 3) uint8 image into a file-like object as an
+    RGB PNG.
+    """
+    height, width, _ = image.shape
+
+    def chunk(tag, data):
+        sink.write(struct.pack('>I', len(data)))
+        sink.write(tag + data)
+        sink.write(struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    # Every row starts with the filter type, 0 means no filter.
+    rows = np.zeros((height, 1 + 3*width), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, -1)
+
+    sink.write(b'\x89PNG\r\n\x1a\n')
+    chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+    chunk(b'IEND', b'')
+
+
+def hex_to_rgb(color: str) -> tuple:
+    return tuple(int(color[idx:idx + 2], 16) for idx in (1, 3, 5))
+
+
+def concatenate(polylines: list, closed: bool, lengths=None):
+    """
+    Joins many polylines into one array, returning it with the
+    indices of the tails of their segments. Closed polylines also
+    get the segment from the last point back to the first. Without
+    lengths, every array of polylines is a single polyline.
+    """
+    points = np.vstack(polylines)
+    if lengths is None:
+        lengths = [len(x) for x in polylines]
+    lengths = np.asarray(lengths)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    tails = np.arange(len(points))
+    heads = tails + 1
+    if closed:
+        heads[ends - 1] = starts
+    else:
+        keep = np.ones(len(points), dtype=bool)
+        keep[ends - 1] = False
+        tails, heads = tails[keep], heads[keep]
+
+    return points, tails, heads, starts
+
+
+def stroke_pixels(points, tails, heads, starts, dash=None):
+    """
+    Returns the pixels covered by the segments from points[tails]
+    to points[heads]. The points are snapped to pixels and every
+    segment is sampled once per pixel of its longest side, so the
+    many tiny segments of finely sampled curves cost little. With
+    dash, the samples in the gaps of the dash pattern, measured from
+    the start of each polyline, are dropped.
+    """
+    points = np.rint(points)
+    deltas = points[heads] - points[tails]
+    steps = np.maximum(
+        np.abs(deltas[:, 0]), np.abs(deltas[:, 1])).astype(np.int64)
+
+    # Parameter of every sample along its own segment, leaving out
+    # the tail, which is the previous segment's head.
+    owner = np.repeat(np.arange(len(steps)), steps)
+    offsets = np.arange(1, len(owner) + 1) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = offsets / np.maximum(steps, 1)[owner]
+
+    pixels = points[tails[owner]]
+    pixels += t[:, None] * deltas[owner]
+    pixels = np.vstack((points[starts], pixels))
+
+    if dash is not None:
+        lengths = np.linalg.norm(deltas, axis=1)
+        distance = np.cumsum(lengths) - lengths
+
+        # Distances restart at the first segment of every polyline.
+        first = np.searchsorted(tails, starts)
+        first = first[first < len(tails)]
+        restart = np.zeros(len(tails))
+        restart[first] = distance[first]
+        distance -= np.maximum.accumulate(restart)
+
+        distance = distance[owner] + t * lengths[owner]
+        distance = np.concatenate((np.zeros(len(starts)), distance))
+        on, off = dash
+        pixels = pixels[distance % (on + off) < on]
+
+    return np.rint(pixels).astype(np.int64)
+
+
+def fill_coverage(points, tails, heads, starts, height, width):
+    """
+    Scanline fill of many polygons at once, with the even odd rule
+    within each polygon. Returns the (H, W) boolean mask of the
+    covered pixels.
+    """
+    y0, y1 = points[tails, 1], points[heads, 1]
+    low, high = np.minimum(y0, y1), np.maximum(y0, y1)
+
+    # Pixel rows whose centers are crossed by each edge, counted on
+    # half open intervals, so every row crosses a polygon an even
+    # number of times.
+    first = np.ceil(low - 0.5).astype(np.int64)
+    count = np.maximum(np.ceil(high - 0.5).astype(np.int64) - first, 0)
+
+    edge = np.repeat(np.arange(len(tails)), count)
+    rows = np.repeat(first, count) + (
+        np.arange(len(edge)) - np.repeat(np.cumsum(count) - count, count))
+
+    x0, x1 = points[tails[edge], 0], points[heads[edge], 0]
+    t = (rows + 0.5 - y0[edge]) / (y1[edge] - y0[edge])
+    xs = x0 + t * (x1 - x0)
+
+    # Within each polygon and row, crossings are paired in order of x.
+    polygon = np.searchsorted(starts, tails[edge], side='right')
+    order = np.lexsort((xs, rows, polygon))
+    rows, xs = rows[order], xs[order]
+
+    starts = np.clip(np.ceil(xs[0::2] - 0.5), 0, width).astype(np.int64)
+    stops = np.clip(np.ceil(xs[1::2] - 0.5), 0, width).astype(np.int64)
+    rows = rows[0::2]
+
+    inside = (rows >= 0) & (rows < height)
+    rows, starts, stops = rows[inside], starts[inside], stops[inside]
+
+    # Spans become +1 and -1 steps integrated along the rows.
+    steps = np.bincount(
+        rows * (width + 1) + starts, minlength=height * (width + 1))
+    steps -= np.bincount(
+        rows * (width + 1) + stops, minlength=height * (width + 1))
+
+    return np.cumsum(steps.reshape(height, width + 1)[:, :width], axis=1) > 0
+
+
+def ellipse_extents(ellipses) -> tuple:
+    """
+    Returns the half width and half height of the bounding boxes of
+    the ellipses, given by rows of center, axes and tilt.
+    """
+    _, _, a, b, tilt = ellipses.T
+    cos, sin = np.cos(tilt), np.sin(tilt)
+    return np.hypot(a * cos, b * sin), np.hypot(a * sin, b * cos)
+
+
+def sample_ellipses(ellipses, scale) -> tuple:
+    """
+    Samples the outlines of the ellipses about once per pixel,
+    returning the points and the number of points of each ellipse.
+    """
+    x, y, a, b, tilt = ellipses.T
+    lengths = np.maximum(
+        np.ceil(2*np.pi * np.maximum(a, b) * scale), 8).astype(np.int64)
+
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    index = np.arange(len(owner)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    t = 2*np.pi * index / lengths[owner]
+
+    u, v = a[owner] * np.cos(t), b[owner] * np.sin(t)
+    cos, sin = np.cos(tilt)[owner], np.sin(tilt)[owner]
+    points = np.column_stack((x[owner] + cos*u - sin*v, y[owner] + sin*u + cos*v))
+    return points, lengths
+
+
+def ellipse_coverage(ellipses, height, width):
+    """
+    Returns the (H, W) boolean mask of the pixels whose centers lie
+    inside the ellipses, given in pixels by rows of center, axes and
+    tilt. Only the pixels of the bounding box of each ellipse are
+    tested.
+    """
+    x, y, a, b, tilt = ellipses.T
+    half_width, half_height = ellipse_extents(ellipses)
+
+    left = np.clip(np.ceil(x - half_width - 0.5), 0, width).astype(np.int64)
+    right = np.clip(np.floor(x + half_width - 0.5) + 1, 0, width).astype(np.int64)
+    top = np.clip(np.ceil(y - half_height - 0.5), 0, height).astype(np.int64)
+    bottom = np.clip(np.floor(y + half_height - 0.5) + 1, 0, height).astype(np.int64)
+    columns = np.maximum(right - left, 0)
+    count = columns * np.maximum(bottom - top, 0)
+
+    owner = np.repeat(np.arange(len(count)), count)
+    index = np.arange(len(owner)) - np.repeat(np.cumsum(count) - count, count)
+    cols = left[owner] + index % columns[owner]
+    rows = top[owner] + index // columns[owner]
+
+    # Offsets of the pixel centers in the frame of their ellipse.
+    dx, dy = cols + 0.5 - x[owner], rows + 0.5 - y[owner]
+    cos, sin = np.cos(tilt)[owner], np.sin(tilt)[owner]
+    u = (cos*dx + sin*dy) / np.maximum(a, 1e-9)[owner]
+    v = (cos*dy - sin*dx) / np.maximum(b, 1e-9)[owner]
+    inside = u*u + v*v <= 1
+
+    mask = np.zeros((height, width), dtype=bool)
+    mask[rows[inside], cols[inside]] = True
+    return mask
+
+
+class RasterRenderer:
+    """
+    Rasterizes the polylines, fills and dots of a board into a NumPy
+    image, as a quick preview that does not need LaTeX. Text nodes
+    are not drawn. Closed arcs whose transforms were conformal are
+    drawn from their center and axes, as the svg backend does,
+    instead of from their points.
+    """
+    # Pixels per centimeter.
+    resolution = 40
+    margin = 0.1
+
+    def __init__(self, resolution=None):
+        if resolution is not None:
+            self.resolution = resolution
+
+    def draw(self, objs) -> np.array:
+        """
+        Returns the (H, W, 3) uint8 image of the objects.
+        """
+        styles = {}
+        fills = {}
+        strokes = {}
+
+        # The objects are grouped by style, so every group is drawn
+        # with a few array operations.
+        for obj in walk(objs):
+            if isinstance(obj, Text):
+                continue
+
+            ellipse = isinstance(obj, EllipticalArc) and obj.conformal and obj.closed
+            if not ellipse:
+                points = obj.get_points()
+                if len(points) == 0:
+                    continue
+
+            key = (obj.draw, tuple(obj.get_kw().items()))
+            try:
+                style = styles[key]
+            except KeyError:
+                style = styles[key] = get_style(obj.get_kw(), draw=obj.draw)
+            except TypeError:
+                style = get_style(obj.get_kw(), draw=obj.draw)
+
+            # Every group holds polylines and ellipses, given by their
+            # center, axes and tilt.
+            if ellipse:
+                x, y, _ = obj.center
+                shape = (x, y, obj.major_axis, obj.minor_axis, obj.tilt)
+                if style['fill'] is not None:
+                    fills.setdefault(style['fill'], ([], []))[1].append(shape)
+                if style['stroke'] is not None:
+                    key = (style['stroke'], style['width'], style['dash'], True)
+                    strokes.setdefault(key, ([], []))[1].append(shape)
+                continue
+
+            if style['fill'] is not None and len(points) > 2:
+                fills.setdefault(style['fill'], ([], []))[0].append(points[:, :2])
+
+            if style['stroke'] is not None:
+                if len(points) == 1:
+                    points = np.vstack((points, points))
+                closed = obj.closed and len(points) > 2
+                key = (style['stroke'], style['width'], style['dash'], closed)
+                strokes.setdefault(key, ([], []))[0].append(points[:, :2])
+
+        scale = self.resolution
+        fills = {
+            key: (
+                concatenate(polylines, closed=True) if polylines else None,
+                np.array(ellipses) if ellipses else None
+            )
+            for key, (polylines, ellipses) in fills.items()
+        }
+
+        # The outlines of the ellipses are stroked as polylines.
+        for key, (polylines, ellipses) in strokes.items():
+            lengths = [len(x) for x in polylines]
+            if ellipses:
+                samples, counts = sample_ellipses(np.array(ellipses), scale)
+                polylines = [*polylines, samples]
+                lengths = [*lengths, *counts]
+            strokes[key] = concatenate(polylines, key[-1], lengths)
+
+        # Columns are reduced one at a time, which is much faster than
+        # reducing the narrow arrays along their first axis.
+        arrays = [x[0] for x, _ in fills.values() if x is not None]
+        arrays += [x[0] for x in strokes.values()]
+        for _, ellipses in fills.values():
+            if ellipses is not None:
+                half = np.column_stack(ellipse_extents(ellipses))
+                arrays += [ellipses[:, :2] - half, ellipses[:, :2] + half]
+        lower = np.zeros(2)
+        upper = np.zeros(2)
+        if arrays:
+            for idx in range(2):
+                lower[idx] = min(x[:, idx].min() for x in arrays)
+                upper[idx] = max(x[:, idx].max() for x in arrays)
+        (left, bottom), (right, top) = lower - self.margin, upper + self.margin
+
+        width = max(int(np.ceil((right - left) * scale)), 1)
+        height = max(int(np.ceil((top - bottom) * scale)), 1)
+        image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+        def to_pixels(points):
+            pixels = np.empty_like(points)
+            pixels[:, 0] = (points[:, 0] - left) * scale
+            pixels[:, 1] = (top - points[:, 1]) * scale
+            return pixels
+
+        for color, (polygons, ellipses) in fills.items():
+            mask = np.zeros((height, width), dtype=bool)
+            if polygons is not None:
+                points, tails, heads, starts = polygons
+                mask |= fill_coverage(
+                    to_pixels(points), tails, heads, starts, height, width)
+            if ellipses is not None:
+                # The y axis points down in the image, which reverses
+                # the tilt.
+                ellipses = np.column_stack((
+                    to_pixels(ellipses[:, :2]),
+                    ellipses[:, 2:4] * scale,
+                    -ellipses[:, 4]
+                ))
+                mask |= ellipse_coverage(ellipses, height, width)
+            image[mask] = hex_to_rgb(color)
+
+        # Strokes are drawn above the fills.
+        for key, (points, tails, heads, starts) in strokes.items():
+            color, line_width, dash, _ = key
+            if dash is not None:
+                dash = tuple(max(x * scale, 1.0) for x in dash)
+
+            pixels = stroke_pixels(to_pixels(points), tails, heads, starts, dash)
+            rgb = hex_to_rgb(color)
+
+            thickness = max(int(round(line_width * scale)), 1)
+            radius = thickness // 2
+            for dx in range(-radius, thickness - radius):
+                for dy in range(-radius, thickness - radius):
+                    xs = pixels[:, 0] + dx
+                    ys = pixels[:, 1] + dy
+                    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+                    image[ys[inside], xs[inside]] = rgb
+
+        return image
+
+    def write(self, objs, sink) -> None:
+        write_png(self.draw(objs), sink)
@@ -2,13 +2,42 @@ import os
 import importlib
 from pathlib import Path
 
+# The settings are resolved on first use, so importing the package
+# neither reads the working directory nor imports the project
+# settings module.
+_settings = None
 
-BASE_DIR = Path().parent.parent.resolve()
-BOARD_DIR = os.path.join(BASE_DIR, 'tikz', 'template')
-OUTPUT_DIR = BASE_DIR
 
-settings_filepath = os.path.join(BASE_DIR, 'settings.py')
+def load() -> dict:
+    """
+    Resolves the settings, overridden by the settings.py of the
+    working directory, if there is one.
+    """
+    global _settings
 
-if os.path.exists(settings_filepath):
-    module = importlib.import_module('settings')
-    OUTPUT_DIR = getattr(module, 'OUTPUT_DIR')
+    if _settings is not None:
+        return _settings
+
+    base_dir = Path().parent.parent.resolve()
+    settings = {
+        'BASE_DIR': base_dir,
+        'OUTPUT_DIR': base_dir,
+        'CACHE_DIR': os.path.join(base_dir, '.tikz-cache'),
+    }
+
+    settings_filepath = os.path.join(base_dir, 'settings.py')
+
+    if os.path.exists(settings_filepath):
+        module = importlib.import_module('settings')
+        settings['OUTPUT_DIR'] = getattr(module, 'OUTPUT_DIR')
+        settings['CACHE_DIR'] = getattr(module, 'CACHE_DIR', settings['CACHE_DIR'])
+
+    _settings = settings
+    return settings
+
+
+def __getattr__(name):
+    try:
+        return load()[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
@@ -1,22 +1,165 @@
+import functools
+import numpy as np
 from .object import TikzObject
+from .utils import to_array
+
+# Bounded LRU caches of sampling templates, by name.
+TEMPLATES = {}
+
+
+def template_cache(maxsize=256):
+    """
+    Memoizes a function returning an array in a bounded LRU cache.
+    The array is shared by all callers, so it is made read only.
+    """
+    def decorator(function):
+        @functools.lru_cache(maxsize=maxsize)
+        def cached(*args):
+            array = function(*args)
+            array.flags.writeable = False
+            return array
+
+        functools.update_wrapper(cached, function)
+        TEMPLATES[function.__name__] = cached
+        return cached
+    return decorator
+
+
+def template_cache_info() -> dict:
+    """
+    Returns the hits, misses and size of every template cache.
+    """
+    return {name: cached.cache_info() for name, cached in TEMPLATES.items()}
+
+
+@template_cache()
+def uniform_parameters(start, end, samples) -> np.array:
+    return np.linspace(start, end, samples, endpoint=False)
+
 
 class Parametric:
-    def __init__(self, function):
+    """
+    Wraps the parametrization of a curve. Vectorized functions
+    receive the whole array of parameters at once and return an
+    (N, 3) array, scalar ones are evaluated one sample at a time.
+    """
+    def __init__(self, function, vectorized=False):
         self.function = function
-    
-    
+        self.vectorized = vectorized
+
+    def __call__(self, t):
+        return self.function(t)
+
+    def sample(self, t: np.array) -> np.array:
+        """
+        Evaluates the function over an array of parameters and
+        returns the respective (N, 3) array of points.
+        """
+        if self.vectorized:
+            return to_array(self.function(t))
+        return to_array([self.function(x) for x in t])
+
 
 class Shape(TikzObject):
+    __slots__ = ('parametric', 'start', 'end', 'params')
+
     samples = 500
 
+    # Opt-in curvature aware sampling. The parameter interval is
+    # refined until the chordal deviation of every segment, measured
+    # in the units of the rendered figure, is below tolerance.
+    adaptive = False
+    tolerance = 1e-3
+    min_samples = 16
+    max_samples = 4096
+
     def __init__(self, parametric, start, end, **kw) -> None:
+        if not isinstance(parametric, Parametric):
+            parametric = Parametric(parametric)
+
         self.parametric = parametric
         self.start = start
         self.end = end
 
-        dt = (end - start) / self.samples
-        points = []
-        for k in range(self.samples):
-            points.append(self.parametric(start + k*dt))
+        if self.adaptive:
+            self.params = self.adaptive_parameters(self.tolerance)
+            points = parametric.sample(self.params)
+        else:
+            self.params = uniform_parameters(start, end, self.samples)
+            points = self.sample_uniform()
 
         super().__init__(points, **kw)
+
+    def sample_uniform(self) -> np.array:
+        """
+        Returns the points of the uniform sampling of the shape, at
+        the parameters in self.params.
+        """
+        return self.parametric.sample(self.params)
+
+    @property
+    def sample_count(self) -> int:
+        """
+        Number of points the shape was sampled with.
+        """
+        return len(self._points)
+
+    def adaptive_parameters(self, tolerance: float) -> np.array:
+        """
+        Returns the parameters of a sampling whose segments deviate
+        at most tolerance from the curve, in model units.
+        """
+        t = np.linspace(self.start, self.end, self.min_samples + 1)
+        points = self.parametric.sample(t)
+
+        while len(t) < self.max_samples:
+            mid = (t[:-1] + t[1:]) / 2
+            mid_points = self.parametric.sample(mid)
+            deviation = np.linalg.norm(
+                mid_points - (points[:-1] + points[1:]) / 2, axis=1)
+
+            refine = np.flatnonzero(deviation > tolerance)
+            if len(refine) == 0:
+                break
+
+            budget = self.max_samples - len(t)
+            if len(refine) > budget:
+                worst = np.argsort(deviation[refine])[::-1][:budget]
+                refine = np.sort(refine[worst])
+
+            t = np.insert(t, refine + 1, mid[refine])
+            points = np.insert(points, refine + 1, mid_points[refine], axis=0)
+
+        if self.closed:
+            t = t[:-1]
+
+        return t
+
+    def resample(self, tolerance=None):
+        """
+        Samples the shape again with the adaptive sampler, taking
+        into account the transforms applied to it so far.
+        """
+        if tolerance is not None:
+            self.tolerance = tolerance
+
+        # Recovers the affine map between the curve and the current
+        # points, so the tolerance can be brought to model units.
+        model = self.parametric.sample(self.params)
+        model = np.hstack((model, np.ones((len(model), 1))))
+        matrix = np.linalg.lstsq(model, self.points, rcond=None)[0]
+        linear, offset = matrix[:3].T, matrix[3]
+
+        scale = np.linalg.norm(linear, 2)
+        if scale == 0:
+            return self
+
+        self.params = self.adaptive_parameters(self.tolerance / scale)
+        self.points = self.parametric.sample(self.params) @ linear.T + offset
+        return self
+
+    def apply_matrix(self, matrix):
+        super().apply_matrix(matrix)
+        if self.adaptive and not np.isclose(np.linalg.norm(matrix[:3, :3], 2), 1.0):
+            self.resample()
+        return self
@@ -0,0 +1,424 @@
+import os
+import re
+import hashlib
+import tempfile
+import subprocess
+from html import escape
+import numpy as np
+
+from .arcs import EllipticalArc
+from .bezier import fit_cubic_bezier
+from .buffer import walk
+from .text import Text
+from . import settings
+
+# TikZ lengths are given in points, while the figure is drawn in
+# centimeters.
+PT = 2.54 / 72.27
+
+LINE_WIDTHS = {
+    'ultra thin': 0.1,
+    'very thin': 0.2,
+    'thin': 0.4,
+    'semithick': 0.6,
+    'thick': 0.8,
+    'very thick': 1.2,
+    'ultra thick': 1.6,
+}
+
+COLORS = {
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'cyan': (0, 255, 255),
+    'magenta': (255, 0, 255),
+    'yellow': (255, 255, 0),
+    'gray': (128, 128, 128),
+    'lightgray': (191, 191, 191),
+    'darkgray': (64, 64, 64),
+    'lightblue': (173, 216, 230),
+    'brown': (191, 128, 64),
+    'lime': (191, 255, 0),
+    'olive': (128, 128, 0),
+    'orange': (255, 128, 0),
+    'pink': (255, 191, 191),
+    'purple': (191, 0, 64),
+    'teal': (0, 128, 128),
+    'violet': (128, 0, 128),
+}
+
+_TIPS = re.compile(r'^([<>a-zA-Z]*)-([<>a-zA-Z]*)$')
+
+
+def to_rgb(color: str) -> tuple:
+    """
+    Converts a TikZ color, including xcolor mixes such as red!30 or
+    red!30!blue, into an RGB tuple.
+    """
+    parts = str(color).strip().split('!')
+    rgb = np.array(COLORS.get(parts[0], COLORS['black']), dtype=np.float64)
+
+    idx = 1
+    while idx < len(parts):
+        percent = float(parts[idx]) / 100
+        other = parts[idx + 1] if idx + 1 < len(parts) else 'white'
+        other = np.array(COLORS.get(other, COLORS['white']), dtype=np.float64)
+        rgb = percent * rgb + (1 - percent) * other
+        idx += 2
+
+    return tuple(int(round(x)) for x in rgb)
+
+
+def svg_color(color: str) -> str:
+    return '#%02x%02x%02x' % to_rgb(color)
+
+
+def get_style(kw: dict, draw=True) -> dict:
+    """
+    Translates the TikZ options of an object into the stroke and
+    fill of its SVG element. The tips are returned under 'tips' as
+    a pair of booleans, for the start and the end of the path.
+    """
+    width = 0.4
+    stroke = svg_color(kw.get('color', 'black')) if draw else None
+    fill = svg_color(kw['fill']) if 'fill' in kw else None
+    dash = None
+    tips = (False, False)
+
+    for key, value in kw.items():
+        if key in LINE_WIDTHS:
+            width = LINE_WIDTHS[key]
+        elif key == 'line width':
+            width = float(str(value).replace('pt', ''))
+        elif key == 'dashed':
+            dash = (3, 3)
+        elif key == 'dotted':
+            dash = (width, 2)
+        elif value is True and key in COLORS:
+            stroke = svg_color(key)
+        else:
+            match = _TIPS.match(key)
+            if value is True and match:
+                tips = (bool(match.group(1)), bool(match.group(2)))
+
+    return {
+        'stroke': stroke,
+        'fill': fill,
+        'width': width * PT,
+        'dash': None if dash is None else tuple(x * PT for x in dash),
+        'tips': tips,
+    }
+
+
+def path_data(points: np.array, closed=False) -> str:
+    """
+    Returns the SVG path data of a polyline, flipping the y axis.
+    """
+    if len(points) == 0:
+        return ''
+
+    points = points[:, :2] * (1.0, -1.0)
+    data = 'M' + ' L'.join(['%.4f %.4f'] * len(points)) % tuple(points.ravel().tolist())
+    if closed:
+        data += ' Z'
+    return data
+
+
+def bezier_data(beziers: np.array, closed=False) -> str:
+    """
+    Returns the SVG path data of piecewise cubic Béziers.
+    """
+    beziers = beziers[..., :2] * (1.0, -1.0)
+    data = 'M%.4f %.4f' % tuple(beziers[0, 0])
+    data += ''.join(
+        ' C%.4f %.4f %.4f %.4f %.4f %.4f' % tuple(x[1:].ravel()) for x in beziers)
+    if closed:
+        data += ' Z'
+    return data
+
+
+def arc_data(arc: EllipticalArc) -> str:
+    """
+    Returns the SVG path data of an arc kept as a native primitive.
+    """
+    rx, ry = arc.major_axis, arc.minor_axis
+    start = arc.get_point(arc.start)
+    end = arc.get_point(arc.end)
+    large = int(abs(arc.end - arc.start) % (2*np.pi) > np.pi)
+    tilt = -np.degrees(arc.tilt)
+
+    # The y axis is flipped, so the counterclockwise TikZ arcs have
+    # sweep flag 0.
+    return (
+        f'M{start[0]:.4f} {-start[1]:.4f} '
+        f'A{rx:.4f} {ry:.4f} {tilt:.4f} {large} 0 {end[0]:.4f} {-end[1]:.4f}'
+    )
+
+
+def curve_data(obj) -> str:
+    """
+    Returns the SVG path data of an object, fitted with Béziers when
+    it has a tolerance.
+    """
+    points = obj.get_points()
+    if obj.bezier_tolerance is not None and len(points) > 2:
+        beziers = fit_cubic_bezier(points, obj.bezier_tolerance, closed=obj.closed)
+        # Curves without two distinct points are not fitted.
+        if len(beziers) > 0:
+            return bezier_data(beziers, closed=obj.closed)
+    return path_data(points, closed=obj.closed)
+
+
+class PlainText:
+    """
+    Renders text nodes as SVG text elements, dropping the math
+    delimiters.
+    """
+    size = 10 * PT
+
+    def render(self, text: Text, x: float, y: float) -> str:
+        content = escape(text.text.replace('$', ''))
+        color = text.get_kw().get('color')
+        color = svg_color(color if isinstance(color, str) else 'black')
+
+        # The node placement options of TikZ, as above or below left.
+        anchor = 'middle'
+        if text.get_kw().get('above'):
+            y += self.size
+        if text.get_kw().get('below'):
+            y -= self.size
+        if text.get_kw().get('left'):
+            anchor = 'end'
+        if text.get_kw().get('right'):
+            anchor = 'start'
+
+        return (
+            f'<text x="{x:.4f}" y="{-y:.4f}" font-size="{self.size:.4f}" '
+            f'font-family="serif" font-style="italic" fill="{color}" '
+            f'text-anchor="{anchor}" dominant-baseline="central">{content}</text>'
+        )
+
+
+class LatexText:
+    """
+    Renders text nodes with LaTeX and dvisvgm. Every distinct
+    string is compiled once and its SVG snippet is cached on disk,
+    so it is reused by later figures. Falls back to PlainText when
+    the compilation fails.
+    """
+    header = '\n'.join((
+        r'\documentclass{standalone}',
+        r'\usepackage{amsmath}',
+    ))
+
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.path.join(settings.CACHE_DIR, 'text')
+        self.directory = directory
+        self.snippets = {}
+        self.fallback = PlainText()
+
+    def get_snippet(self, text: str):
+        """
+        Returns the width, height and content of the SVG of the
+        text, in centimeters, or None if it could not be created.
+        """
+        digest = hashlib.sha256((self.header + text).encode('utf-8'))
+        digest = digest.hexdigest()[:16]
+
+        if digest in self.snippets:
+            return self.snippets[digest]
+
+        path = os.path.join(self.directory, f'{digest}.svg')
+        if not os.path.exists(path):
+            self.compile(text, path)
+
+        snippet = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                snippet = self.parse(f.read(), digest)
+
+        self.snippets[digest] = snippet
+        return snippet
+
+    def compile(self, text: str, path: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix='tikz-') as build_dir:
+            source = os.path.join(build_dir, 'text.tex')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write(self.header)
+                f.write('\n\\begin{document}\n%s\n\\end{document}\n' % text)
+
+            try:
+                latex = subprocess.run(
+                    [
+                        'latex',
+                        '-interaction=nonstopmode',
+                        f'-output-directory={build_dir}',
+                        source
+                    ],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL
+                )
+                if latex.returncode != 0:
+                    return
+
+                subprocess.run(
+                    [
+                        'dvisvgm',
+                        '--no-fonts',
+                        '--exact-bbox',
+                        '-o', path,
+                        os.path.join(build_dir, 'text.dvi')
+                    ],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except FileNotFoundError:
+                return
+
+    @staticmethod
+    def parse(svg: str, prefix: str):
+        match = re.search(r'<svg[^>]*viewBox=["\']([^"\']*)["\'][^>]*>(.*)</svg>', svg, re.S)
+        if match is None:
+            return None
+
+        x, y, width, height = (float(v) for v in match.group(1).split())
+        content = match.group(2)
+
+        # Glyph ids of different snippets must not collide.
+        content = re.sub(r'id=(["\'])', rf'id=\1{prefix}-', content)
+        content = re.sub(r'href=(["\'])#', rf'href=\1#{prefix}-', content)
+
+        return x * PT, y * PT, width * PT, height * PT, content
+
+    def render(self, text: Text, x: float, y: float) -> str:
+        snippet = self.get_snippet(text.text)
+        if snippet is None:
+            return self.fallback.render(text, x, y)
+
+        left, top, width, height, content = snippet
+        return (
+            f'<g transform="translate({x - width/2 - left:.4f} '
+            f'{-y - height/2 - top:.4f}) scale({PT:.6f})">{content}</g>'
+        )
+
+
+class SvgRenderer:
+    """
+    Draws the objects of a board directly as SVG, from the same
+    points and options that are used to write the TikZ code.
+    """
+    margin = 0.1
+
+    def __init__(self, text=None):
+        self.text = PlainText() if text is None else text
+
+    def render_element(self, obj, markers: dict) -> str:
+        if isinstance(obj, Text):
+            x, y, _ = obj.get_points()[0]
+            return self.text.render(obj, x, y)
+
+        style = get_style(obj.get_kw(), draw=obj.draw)
+
+        if isinstance(obj, EllipticalArc) and obj.conformal and obj.closed:
+            cx, cy, _ = obj.center
+            tilt = -np.degrees(obj.tilt)
+            if obj.is_circular():
+                element = (
+                    f'<circle cx="{cx:.4f}" cy="{-cy:.4f}" '
+                    f'r="{obj.major_axis:.4f}"'
+                )
+            else:
+                element = (
+                    f'<ellipse cx="{cx:.4f}" cy="{-cy:.4f}" '
+                    f'rx="{obj.major_axis:.4f}" ry="{obj.minor_axis:.4f}" '
+                    f'transform="rotate({tilt:.4f} {cx:.4f} {-cy:.4f})"'
+                )
+        else:
+            if isinstance(obj, EllipticalArc) and obj.conformal:
+                data = arc_data(obj)
+            else:
+                data = curve_data(obj)
+            element = f'<path d="{data}"'
+
+        element += f' fill="{style["fill"] or "none"}"'
+
+        if style['stroke'] is not None:
+            element += (
+                f' stroke="{style["stroke"]}" '
+                f'stroke-width="{style["width"]:.4f}" stroke-linejoin="round"'
+            )
+            if style['dash'] is not None:
+                element += ' stroke-dasharray="%.4f %.4f"' % style['dash']
+
+            start, end = style['tips']
+            if start or end:
+                marker = markers.setdefault(
+                    style['stroke'], f'tip-{len(markers)}')
+                if start:
+                    element += f' marker-start="url(#{marker})"'
+                if end:
+                    element += f' marker-end="url(#{marker})"'
+
+        return element + '/>'
+
+    def get_bounds(self, objs) -> tuple:
+        lower = np.full(2, np.inf)
+        upper = np.full(2, -np.inf)
+
+        for obj in objs:
+            if isinstance(obj, EllipticalArc) and obj.conformal and obj.closed:
+                radius = max(obj.major_axis, obj.minor_axis)
+                points = np.array([obj.center - radius, obj.center + radius])
+            else:
+                points = obj.get_points()
+            if len(points):
+                lower = np.minimum(lower, points[:, :2].min(axis=0))
+                upper = np.maximum(upper, points[:, :2].max(axis=0))
+
+        if not np.all(np.isfinite(lower)):
+            lower = upper = np.zeros(2)
+
+        return lower - self.margin, upper + self.margin
+
+    def write(self, objs, sink) -> None:
+        """
+        Writes the SVG document of the objects into a file-like
+        object.
+        """
+        objs = list(walk(objs))
+        (left, bottom), (right, top) = self.get_bounds(objs)
+        width, height = right - left, top - bottom
+
+        markers = {}
+        elements = [self.render_element(obj, markers) for obj in objs]
+
+        sink.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{width:.4f}cm" height="{height:.4f}cm" '
+            f'viewBox="{left:.4f} {-top:.4f} {width:.4f} {height:.4f}">\n'
+        )
+
+        if markers:
+            sink.write('<defs>\n')
+            for color, marker in markers.items():
+                sink.write(
+                    f'<marker id="{marker}" viewBox="0 0 10 10" refX="8" '
+                    'refY="5" markerWidth="8" markerHeight="8" '
+                    'orient="auto-start-reverse">'
+                    f'<path d="M0 0 L10 5 L0 10 L3 5 Z" fill="{color}"/>'
+                    '</marker>\n'
+                )
+            sink.write('</defs>\n')
+
+        for element in elements:
+            sink.write(element)
+            sink.write('\n')
+
+        sink.write('</svg>\n')
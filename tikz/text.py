@@ -1,13 +1,19 @@
 from .object import TikzObject
-from .utils import proj
+from .properties import intern_style
+from .utils import proj, format_points
 import numpy as np
 
+# Point every text starts at, shared until the text is moved.
+_ORIGIN_POINTS = np.zeros((1, 3))
+_ORIGIN_POINTS.flags.writeable = False
+
 class Text(TikzObject):
+    __slots__ = ('text',)
+
     def __init__(self, text, **kw) -> None:
         self.text = text
-        self.kw = kw
-        self.points = np.array([[0.0, 0.0, 0.0]])
-        self.subobjs = []
+        self._kw = intern_style(kw)
+        self.points = _ORIGIN_POINTS
     
     def next_to(self, kobj, direction):
         extreme = kobj.get_extreme(direction)
@@ -16,8 +22,11 @@ class Text(TikzObject):
         self.move_to(center).shift(vector + 0.2*direction)
         return self
     
-    def render(self) -> str:
-        point = f'({", ".join(str(x) for x in self.points[0])})'
+    def get_render_key(self, precision: int) -> tuple:
+        return (self.version, precision, self.text)
+
+    def render_line(self, precision: int) -> str:
+        (point,) = format_points(self.get_points()[:1], precision)
 
         def kw_to_str(key, value):
             if value:
@@ -25,7 +34,7 @@ class Text(TikzObject):
             else:
                 return f'{key}={value}'
 
-        kw = ', '.join(kw_to_str(x, y) for x, y in self.kw.items())
+        kw = ', '.join(kw_to_str(x, y) for x, y in self.get_kw().items())
         if kw != '':
             kw = f'[{kw}]'
 
@@ -34,5 +43,7 @@ class Text(TikzObject):
         return f'\\node{kw} at {point} {text};'
 
 class MathText(Text):
+    __slots__ = ()
+
     def __init__(self, text, **kw) -> None:
         super().__init__(f'${text}$', **kw)
@@ -1,4 +1,5 @@
 from typing import Iterable, Union
+import re
 import numpy as np
 from typing import Sequence
 from .constants import ORIGIN, OUT
@@ -11,11 +12,63 @@ def to_array(iterable: Iterable[Union[int, float]]):
     return np.array(iterable, dtype=np.float64)
 
 
-def versor(angle: float) -> np.array:
+_TRAILING_ZEROS = re.compile(r'\.?0+(?=[,)]|$)')
+
+
+def format_number(number: float, precision: int = 4) -> str:
     """
-    Returns the rho versor.
+    Returns the number rounded to the given precision, without
+    trailing zeros.
     """
-    return to_array([np.cos(angle), np.sin(angle), 0.0])
+    text = f'{round(float(number), precision) + 0.0:.{precision}f}'
+    if precision > 0:
+        text = _TRAILING_ZEROS.sub('', text)
+    return text
+
+
+def format_points(
+    points: np.array,
+    precision: int = 4,
+    collapse: bool = True
+) -> list:
+    """
+    Converts an (N, 3) array of points into TikZ coordinates with
+    a single formatting operation. The z coordinate is omitted when
+    it is zero for every point and, if collapse is set, consecutive
+    points that become equal after rounding are emitted once.
+    """
+    if len(points) == 0:
+        return []
+
+    points = np.round(points, precision) + 0.0
+
+    if not points[:, 2].any():
+        points = points[:, :2]
+
+    if collapse and len(points) > 1:
+        keep = np.empty(len(points), dtype=bool)
+        keep[0] = True
+        np.any(points[1:] != points[:-1], axis=1, out=keep[1:])
+        points = points[keep]
+
+    number = f'%.{precision}f'
+    coordinate = '(' + ', '.join([number] * points.shape[1]) + ')'
+    text = '\n'.join([coordinate] * len(points)) % tuple(points.ravel().tolist())
+
+    if precision > 0:
+        text = _TRAILING_ZEROS.sub('', text)
+
+    return text.split('\n')
+
+
+def versor(angle: Union[float, np.array]) -> np.array:
+    """
+    Returns the rho versor. If an array of angles is given,
+    returns an (N, 3) array with one versor per angle.
+    """
+    angle = np.asarray(angle, dtype=np.float64)
+    return np.stack(
+        (np.cos(angle), np.sin(angle), np.zeros_like(angle)), axis=-1)
 
 
 def get_angle(array: np.array) -> float:
@@ -56,24 +109,25 @@ def LLint(line1_point1, line1_point2, line2_point1, line2_point2):
 def quaternion_mult(*quats: Sequence[float]) -> np.ndarray:
     """
     Receives quaternions and returns the result of their
-    multiplication.
+    multiplication. Each quaternion may also be an (N, 4) array,
+    in which case the products are taken row by row.
     """
     quats = iter(quats)
     try:
-        result = next(quats)
+        result = to_array(next(quats))
     except StopIteration:
         return to_array([1, 0, 0, 0])
 
     for quat in quats:
-        w1, x1, y1, z1 = result
-        w2, x2, y2, z2 = quat
-        result = [
+        w1, x1, y1, z1 = np.moveaxis(result, -1, 0)
+        w2, x2, y2, z2 = np.moveaxis(to_array(quat), -1, 0)
+        result = np.stack([
             w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
             w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
             w1 * y2 + y1 * w2 + z1 * x2 - x1 * z2,
             w1 * z2 + z1 * w2 + x1 * y2 - y1 * x2,
-        ]
-    return to_array(result)
+        ], axis=-1)
+    return result
 
 
 def quaternion_conjugate(quaternion) -> np.array:
@@ -81,10 +135,20 @@ def quaternion_conjugate(quaternion) -> np.array:
     Receives a quaternion and returns it's conjugate.
     """
     result = to_array(quaternion)
-    result[1:] *= -1
+    result[..., 1:] *= -1
     return result
 
 
+def rotation_quaternion(angle: float, axis: np.array = OUT) -> np.array:
+    """
+    Returns the unit quaternion of the rotation by angle about
+    the axis.
+    """
+    axis = to_array(axis)
+    axis *= np.sin(angle/2)/np.linalg.norm(axis)
+    return np.append(np.cos(angle/2), axis)
+
+
 def rotate(
     vector: np.array,
     angle: float,
@@ -94,15 +158,64 @@ def rotate(
     Uses quaternion multiplication to rotate a vector by a
     given angle with respect to the axis.
     """
-    axis = to_array(axis)
-    axis *= np.sin(angle/2)/np.linalg.norm(axis)
+    return rotate_many(vector, angle, axis)
+
 
-    x, y, z = tuple(axis)
-    u = (np.cos(angle/2), x, y, z)
+def rotate_many(
+    vectors: np.array,
+    angle: float,
+    axis: np.array = OUT
+) -> np.array:
+    """
+    Rotates an (N, 3) array of vectors by a given angle with
+    respect to the axis, using one batched quaternion product.
+    """
+    vectors = to_array(vectors)
+    u = rotation_quaternion(angle, axis)
     u_ = quaternion_conjugate(u)
 
-    x, y, z = tuple(vector)
-    return quaternion_mult(u, (0, x, y, z), u_)[1:]
+    quats = np.concatenate(
+        (np.zeros(vectors.shape[:-1] + (1,)), vectors), axis=-1)
+    return quaternion_mult(u, quats, u_)[..., 1:]
+
+
+def rotation_matrix(angle: float, axis: np.array = OUT) -> np.array:
+    """
+    Returns the 3x3 matrix of the rotation by angle about the
+    axis.
+    """
+    w, x, y, z = rotation_quaternion(angle, axis)
+    return to_array([
+        [1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)],
+        [2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)],
+        [2*(x*z - y*w), 2*(y*z + x*w), 1 - 2*(x*x + y*y)],
+    ])
+
+
+def reflection_matrix(normal: np.array) -> np.array:
+    """
+    Returns the 3x3 matrix of the reflection about the plane
+    through the origin normal to the given vector.
+    """
+    normal = to_array(normal)
+    return np.eye(3) - 2 * np.outer(normal, normal) / np.dot(normal, normal)
+
+
+def affine_matrix(
+    linear: np.array = None,
+    offset: np.array = ORIGIN,
+    about_point: np.array = ORIGIN
+) -> np.array:
+    """
+    Returns the 4x4 matrix, in homogeneous coordinates, of the
+    map p -> linear (p - about_point) + about_point + offset.
+    """
+    matrix = np.eye(4)
+    if linear is not None:
+        matrix[:3, :3] = linear
+    about_point = to_array(about_point)
+    matrix[:3, 3] = about_point - matrix[:3, :3] @ about_point + offset
+    return matrix
 
 
 def reflect(point, normal, about_point=ORIGIN):
@@ -134,3 +247,34 @@ def cumulative(*arrays):
     Returns the cumulative sum of the given arrays.
     """
     return np.cumsum(arrays, axis=0)
+
+
+def convex_hull(points: np.array) -> np.array:
+    """
+    Returns the sorted indices of the points on the boundary of
+    the convex hull of points, collinear ones included, through
+    Andrew's monotone chain. Points off a plane of constant z are
+    all returned.
+    """
+    if len(points) < 3 or np.ptp(points[:, 2]) > 0:
+        return np.arange(len(points))
+
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    xy = points[order, :2].tolist()
+
+    def chain(indices):
+        stack = []
+        for idx in indices:
+            x, y = xy[idx]
+            while len(stack) > 1:
+                x1, y1 = xy[stack[-2]]
+                x2, y2 = xy[stack[-1]]
+                if (x2 - x1)*(y - y1) - (y2 - y1)*(x - x1) >= 0:
+                    break
+                stack.pop()
+            stack.append(idx)
+        return stack
+
+    lower = chain(range(len(xy)))
+    upper = chain(range(len(xy) - 1, -1, -1))
+    return np.unique(order[lower + upper])
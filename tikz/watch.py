@@ -0,0 +1,189 @@
+import os
+import time
+import hashlib
+import inspect
+import importlib
+import importlib.util
+from .board import Board
+from .cache import get_counts
+
+
+def get_boards(module) -> dict:
+    """
+    Returns the Board subclasses defined in the module by name.
+    """
+    return {
+        name: class_
+        for name, class_ in inspect.getmembers(module, inspect.isclass)
+        if issubclass(class_, Board)
+        and class_ is not Board
+        and class_.__module__ == module.__name__
+    }
+
+
+def get_stamp(filepath):
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Watcher:
+    """
+    Keeps the boards of some modules rendered. The modules are polled
+    and reloaded when saved, and only the boards whose source changed
+    are constructed again. Those whose document did not change are
+    not compiled again either.
+    """
+    interval = 0.5
+
+    def __init__(self, modules: dict, selected: dict, render, report=None):
+        """
+        Receives the modules to watch by file path, the names of the
+        boards selected from each one (all of them when empty), a
+        function that renders a board instance, taking the digest of
+        its previous document, and a function that reports the
+        results of each round.
+        """
+        self.modules = modules
+        self.selected = selected
+        self.render = render
+        self.report = report
+        self.stamps = {x: get_stamp(x) for x in modules}
+        self.fingerprints = {}
+        self.digests = {}
+
+    def get_fingerprints(self, filepath) -> dict:
+        """
+        Hashes the source of every selected board together with
+        the boards it inherits from and the code of the module that
+        is not part of any board.
+        """
+        module = self.modules[filepath]
+        boards = get_boards(module)
+
+        with open(filepath, encoding='utf-8') as f:
+            shared = f.read()
+
+        sources = {}
+        for name, class_ in boards.items():
+            try:
+                sources[name] = inspect.getsource(class_)
+            except (OSError, TypeError):
+                sources[name] = name
+            shared = shared.replace(sources[name], '')
+
+        names = self.selected[filepath] or list(boards)
+        fingerprints = {}
+        for name in names:
+            digest = hashlib.sha256(shared.encode('utf-8'))
+            for base in boards[name].__mro__:
+                if base.__module__ == module.__name__ and base.__name__ in sources:
+                    digest.update(sources[base.__name__].encode('utf-8'))
+            fingerprints[name] = (boards[name], digest.hexdigest())
+        return fingerprints
+
+    def reload(self, filepath) -> None:
+        module = self.modules[filepath]
+
+        # The bytecode cache is only validated by the modification time
+        # in seconds and the size, which quick edits may keep.
+        try:
+            os.remove(importlib.util.cache_from_source(module.__file__))
+        except (FileNotFoundError, NotImplementedError):
+            pass
+
+        self.modules[filepath] = importlib.reload(module)
+
+    def render_board(self, filepath, name, class_):
+        """
+        Renders a board, returning the same results as the command
+        line renders.
+        """
+        start = time.perf_counter()
+        hits, misses = get_counts(Board.cache)
+        key = (filepath, name)
+
+        try:
+            instance = class_()
+            success = self.render(instance, previous=self.digests.get(key))
+            self.digests[key] = instance.digest
+            error = None if success else 'compilation failed'
+        except Exception as exc:
+            success = False
+            error = f'{type(exc).__name__}: {exc}'
+
+        new_hits, new_misses = get_counts(Board.cache)
+        return (
+            name, success, time.perf_counter() - start, error,
+            new_hits - hits, new_misses - misses
+        )
+
+    def update(self, filepaths) -> list:
+        """
+        Renders the boards of the given modules that changed since
+        they were last rendered successfully.
+        """
+        results = []
+
+        for filepath in filepaths:
+            try:
+                fingerprints = self.get_fingerprints(filepath)
+            except Exception as exc:
+                print(f'Could not read the boards of {filepath}: {exc}')
+                continue
+
+            for name, (class_, fingerprint) in fingerprints.items():
+                key = (filepath, name)
+                if self.fingerprints.get(key) == fingerprint:
+                    continue
+
+                result = self.render_board(filepath, name, class_)
+                if result[1]:
+                    self.fingerprints[key] = fingerprint
+                results.append(result)
+
+        return results
+
+    def poll(self) -> list:
+        """
+        Reloads the modules saved since the last poll and renders
+        their changed boards.
+        """
+        changed = []
+
+        for filepath, stamp in self.stamps.items():
+            try:
+                new_stamp = get_stamp(filepath)
+            except FileNotFoundError:
+                continue
+            if new_stamp == stamp:
+                continue
+
+            self.stamps[filepath] = new_stamp
+            try:
+                self.reload(filepath)
+            except Exception as exc:
+                print(f'Could not reload {filepath}: {type(exc).__name__}: {exc}')
+                continue
+            changed.append(filepath)
+
+        return self.update(changed)
+
+    def run(self) -> None:
+        """
+        Renders every board and then keeps polling until interrupted.
+        """
+        def step(update):
+            start = time.perf_counter()
+            results = update()
+            if results and self.report is not None:
+                self.report(results, time.perf_counter() - start)
+
+        step(lambda: self.update(list(self.modules)))
+        print(f'Watching {", ".join(self.modules)} for changes.')
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                step(self.poll)
+        except KeyboardInterrupt:
+            pass